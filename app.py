@@ -1,11 +1,18 @@
+import time
+STARTED_AT = time.perf_counter()
+
+import multiprocessing
 from tkinter import Tk
 from tkinter import *
-from utils.assets_loader import load_model
+from utils.assets_loader import load_model_async, load_prediction_cache, load_comment_store, load_moderation_journal, load_tier_policy
+from utils.logger import logger
 from src.menu import MenuUI
 from src.authenticator import AuthSection
 from src.comments_loader import CommentsLoaderSection
 from src.comments_remover import CommentsRemoverSection
 from src.footer import FooterUI
+from utils.streaming_classifier import StreamingClassifier
+from core.service import CommentsService
 from config.config import Config
 
 
@@ -24,20 +31,28 @@ class App:
         
 
     def run_app(self):
-        model = load_model()
+        model_handle = load_model_async()
+        classifier = StreamingClassifier(model_handle, load_prediction_cache(), load_tier_policy())
+        service = CommentsService(model_handle, classifier, load_comment_store(), load_moderation_journal())
         menu_ui = MenuUI(self.root)
         menu_ui.render()
         auth_section = AuthSection(self.root)
         auth_section.render()
-        comments_loader = CommentsLoaderSection(self.root, auth_section.get_youtube)
+        comments_loader = CommentsLoaderSection(self.root, auth_section.get_client_pool, service)
         comments_loader.render()
-        comments_remover = CommentsRemoverSection(self.root, model, auth_section.get_youtube, comments_loader.get_comments)
+        comments_remover = CommentsRemoverSection(self.root, auth_section.get_client_pool, comments_loader.get_comments, service)
         comments_remover.render()
         footer = FooterUI(self.root)
         footer.render()
+        self.root.after_idle(self._on_first_frame)
         self.root.mainloop()
 
 
+    def _on_first_frame(self) -> None:
+        logger(f"First frame after {time.perf_counter() - STARTED_AT:.2f}s.", 'INFO')
+
+
 if __name__ == "__main__":
+    multiprocessing.freeze_support()        # Worker processes in the PyInstaller build.
     app = App()
     app.run_app()
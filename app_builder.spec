@@ -4,15 +4,19 @@ os.environ["SKLEARN_SKIP_HTML"] = "1"
 
 from PyInstaller.utils.hooks import collect_submodules, collect_data_files
 
-hiddenimports = collect_submodules('sklearn')
-datas = collect_data_files('sklearn')
+# With a compact model.npz the bundle does not need scikit-learn at all.
+compact = os.path.exists('assets/model.npz')
+hiddenimports = [] if compact else collect_submodules('sklearn')
+datas = [] if compact else collect_data_files('sklearn')
+datas += collect_data_files('googleapiclient')       # Bundled discovery documents.
+model_data = ('assets/model.npz', 'assets') if compact else ('assets/model.pkl', 'assets')
 
 a = Analysis(
     ['app.py'],
     pathex=[],
     binaries=[],
     datas=[
-        ('assets/model.pkl', 'assets'),
+        model_data,
         ('assets/logs.log', 'assets'),
         ('assets/favicon.ico', 'assets'),
         *datas
@@ -21,7 +25,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['sklearn', 'scipy', 'joblib'] if compact else [],
     noarchive=False,
     optimize=0,
 )
@@ -8,9 +8,18 @@ class Config:
             return Path(sys._MEIPASS) / relative_path
         return Path(relative_path)
 
+    USER_DATA_DIR = Path.home() / ".youtube_comments_remover"
+    TOKEN_PATH = USER_DATA_DIR / "token.json"
+    DISCOVERY_CACHE_PATH = USER_DATA_DIR / "youtube.v3.json"
+    COMMENT_STORE_PATH = USER_DATA_DIR / "comments.db"
+    QUOTA_PATH = USER_DATA_DIR / "quota.json"
+    MODERATION_JOURNAL_PATH = USER_DATA_DIR / "moderation_journal.jsonl"
+    PREDICTION_CACHE_PATH = USER_DATA_DIR / "predictions.db"
+
     LOGO_PATH = resource_path("assets/favicon.ico")
     LOGS_PATH = resource_path("assets/logs.log")
     MODEL_PATH = resource_path("assets/model.pkl")
+    COMPACT_MODEL_PATH = resource_path("assets/model.npz")
     
     MAIN_WINDOW_WIDTH = 400
     MAIN_WINDOW_HEIGHT = 500
@@ -19,11 +28,60 @@ class Config:
     LOG_WINDOW_WIDTH = 600
     LOG_WINDOW_HEIGHT = 400
     LOG_WINDOW_TITLE = "Log(s)"
+    LOG_MAX_BYTES = 5 * 1024 * 1024
+    LOG_BACKUP_COUNT = 3
+    LOG_FORMAT = "text"         # "text" or "jsonl".
+    LOG_PAGE_SIZE = 64 * 1024
+    METRICS_ENABLED = False     # Also switchable from File > Performance.
+    METRICS_REFRESH_MS = 1000
     
     REMOVE_CONFIRMATION_WINDOW_WIDTH = 600
     REMOVE_CONFIRMATION_WINDOW_HEIGHT = 400
     REMOVE_CONFIRMATION_WINDOW_TITLE = "Confirm Removal"
     
+    PAGE_PREFETCH = 2
+    LOAD_REPLIES = True
+    REPLY_WORKERS = 2
+    SYNC_RECHECK_PAGES = 2      # Known pages re-read on a re-sync for threads that gained replies.
+    SWEEP_WORKERS = 4           # Videos fetched at once; keep at or below CLIENT_POOL_SIZE.
+    SWEEP_MAX_VIDEOS = 0        # 0 sweeps every upload.
+    TREE_ROW_MARGIN = 2
+    
+    PREDICTION_CACHE_SIZE = 100_000
+    NORMALIZER_WORKERS = 1
+    INFERENCE_WORKERS = 0               # 0 uses every core.
+    INFERENCE_CHUNK_SIZE = 20_000
+    DUPLICATE_CLUSTERING = True
+    DUPLICATE_THRESHOLD = 0.5               # Similarity that groups comments for review.
+    DUPLICATE_PROPAGATE_THRESHOLD = 0.9     # Above it a comment takes its cluster's verdict unscored.
+    AUTO_REMOVE_THRESHOLD = 0.75            # Spam score from which removal needs no review.
+    REVIEW_THRESHOLD = 0.5                  # Spam score above which a comment is flagged at all.
+    SPAM_KEYWORDS = (                       # Flagged outright, without the model. Matched in normalized text.
+        "gacor", "maxwin", "rtp live", "rtp slot", "slot online", "situs slot", "link slot",
+        "depo 10rb", "deposit 10rb", "wd lancar", "jp paus", "scatter hitam", "bandar togel",
+        "pulau777", "dora77", "alexis17", "sgi88", "aero88", "weton88", "lazad88",
+    )
+    
+    CLIENT_POOL_SIZE = 6
+    HTTP_TIMEOUT = 30
+    
+    DAILY_QUOTA = 10_000
+    QUOTA_RESERVE = 2_500       # Units loading may not touch, kept for moderation.
+    API_RATE = 20.0             # Requests per second.
+    API_BURST = 20
+    
+    MODERATION_IDS_PER_CALL = 50
+    MODERATION_CALLS_PER_BATCH = 0
+    MODERATION_WORKERS = 4
+    MODERATION_MAX_RETRIES = 4
+    MODERATION_BACKOFF = 0.5
+    RESUME_CHECK_INTERVAL_MS = 1000       # Until silent auth has a client pool.
+    
+    PING_HOST = "youtube.googleapis.com"
+    PING_PORT = 443
+    PING_INTERVAL = 1.0
+    
     SCOPES = ["https://www.googleapis.com/auth/youtube.force-ssl"]
     VIDEO_ID_PATTERN = r"(?:v=|\/)([0-9A-Za-z_-]{11})"
-    COMMENT_ID_PATTERN = r"Ug[\w-]+"
\ No newline at end of file
+    CHANNEL_PATTERN = r"youtube\.com\/(?:channel\/(UC[\w-]{22})|(@[\w.-]+))"
+    COMMENT_ID_PATTERN = r"Ug[\w.-]+"     # Reply ids are "<thread id>.<reply id>".
\ No newline at end of file
@@ -0,0 +1,246 @@
+import argparse
+import json
+import re
+import sys
+from concurrent.futures import Future
+from typing import List, Optional
+from googleapiclient.errors import HttpError
+from config.config import Config
+from core.service import CommentsService
+from utils.assets_loader import load_comment_store, load_model, load_moderation_journal, load_prediction_cache, load_tier_policy
+from utils.comment_table import CommentTable
+from utils.logger import flush_logs, logger
+from utils.metrics import metrics
+from utils.quota_scheduler import get_quota_scheduler
+from utils.spam_tiers import TIER_AUTO
+from utils.streaming_classifier import StreamingClassifier
+from utils.token_store import load_credentials, refresh_credentials, save_credentials
+from utils.youtube_client import YouTubeClientPool
+
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2          # Also what argparse exits with.
+EXIT_AUTH = 3
+EXIT_API = 4
+EXIT_PARTIAL = 5        # Some comments could not be removed.
+EXIT_INTERRUPTED = 130
+
+
+class Output:
+    def __init__(self, as_json: bool, stream=None) -> None:
+        self.as_json = as_json
+        self.stream = stream or sys.stdout
+
+
+    def emit(self, event: str, **fields) -> None:
+        if self.as_json:
+            line = json.dumps({"event": event, **fields}, ensure_ascii=False)
+        else:
+            line = f"{event}: " + "  ".join(f"{k}={v}" for k, v in fields.items())
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+
+def parse_video_id(value: str) -> Optional[str]:
+    if re.fullmatch(r"[0-9A-Za-z_-]{11}", value):
+        return value
+    match = re.search(Config.VIDEO_ID_PATTERN, value)
+    return match.group(1) if match else None
+
+
+def parse_channel(value: str) -> Optional[str]:
+    if re.fullmatch(r"UC[\w-]{22}|@[\w.-]+", value):
+        return value
+    match = re.search(Config.CHANNEL_PATTERN, value)
+    return (match.group(1) or match.group(2)) if match else None
+
+
+def connect() -> Optional[YouTubeClientPool]:
+    # Headless runs reuse the token saved by the app; there is no browser to authorize in.
+    credentials = load_credentials(Config.TOKEN_PATH, Config.SCOPES)
+    if credentials is None or not refresh_credentials(credentials):
+        return None
+    save_credentials(credentials, Config.TOKEN_PATH)
+    return YouTubeClientPool.for_credentials(credentials, Config.CLIENT_POOL_SIZE, Config.HTTP_TIMEOUT, get_quota_scheduler())
+
+
+def create_service(use_store: bool = True, with_model: bool = True) -> Optional[CommentsService]:
+    model_handle = Future()
+    if not with_model:
+        model_handle.set_result(None)       # Resuming sends journaled ids, nothing is classified.
+        return CommentsService(model_handle, None, load_comment_store() if use_store else None, load_moderation_journal())
+
+    model = load_model()
+    if model is None:
+        return None
+
+    model_handle.set_result(model)
+    classifier = StreamingClassifier(model_handle, load_prediction_cache(), load_tier_policy())
+    return CommentsService(model_handle, classifier, load_comment_store() if use_store else None, load_moderation_journal())
+
+
+def run_sweep(args: argparse.Namespace, client_pool: YouTubeClientPool, service: CommentsService, out: Output) -> int:
+    targets = [("video", v) for v in args.video or []] + [("channel", c) for c in args.channel or []]
+    exit_code = EXIT_OK
+    totals = {"comments": 0, "flagged": 0, "auto": 0, "review": 0, "keyword_hits": 0, "removed": 0, "failed": 0}
+
+    for kind, target in targets:
+        comments = CommentTable()
+        on_page = lambda newer, older, progress: comments.extend(newer + older)
+
+        if kind == "video":
+            report = service.load_video(client_pool, target, on_page=on_page)
+            out.emit("loaded", video_id=target, comments=len(comments), cached=report.cached,
+                     replies=report.progress.replies, quota_paused=report.quota_paused, elapsed_s=round(report.progress.elapsed, 3))
+            for parent_id, error in report.reply_errors:
+                out.emit("warning", parent_id=parent_id, error=error)
+
+        else:
+            on_video = lambda result, done, total: out.emit(
+                "video", video_id=result.video_id, comments=result.comments, elapsed_s=round(result.elapsed, 3),
+                comments_per_s=round(result.rate, 1), error=result.error, done=done, total=total
+            )
+            report, _ = service.sweep_channel(client_pool, target, on_page=on_page, on_video=on_video)
+            out.emit("loaded", channel=target, videos=len(report.results), failed_videos=len(report.failed),
+                     comments=len(comments), elapsed_s=round(report.elapsed, 3))
+
+        flagged = service.flag(comments)
+        for comment in flagged:
+            out.emit("flagged", **{k: comment[k] for k in ("video_id", "id", "parent_id", "cluster", "tier", "score", "keyword", "author", "text") if k in comment})
+
+        stats = service.classifier.stats
+        out.emit("stages", keyword_hits=stats.keyword_hits, keyword_s=round(stats.keyword_time, 3), scored=stats.scored,
+                 scoring_s=round(stats.scoring_time, 3), auto=stats.auto, review=stats.review, keep=stats.classified - stats.flagged)
+
+        totals["comments"] += len(comments)
+        totals["flagged"] += len(flagged)
+        totals["auto"] += stats.auto
+        totals["review"] += stats.review
+        totals["keyword_hits"] += stats.keyword_hits
+
+        # Unattended runs can leave the review tier for a person.
+        to_remove = [c for c in flagged if c.get("tier") == TIER_AUTO] if args.auto_only else flagged
+        if args.dry_run or not to_remove:
+            continue
+
+        estimate = service.estimate_removal(client_pool, len(to_remove))
+        if estimate is not None:
+            out.emit("estimate", cost=estimate.cost, remaining=estimate.remaining, fits=estimate.fits)
+
+        moderation = service.remove(client_pool, [c["id"] for c in to_remove], ban_author=args.ban_author)
+        for result in moderation.results:
+            out.emit("removed", id=result.comment_id, ok=result.ok, error=result.error, attempts=result.attempts)
+        totals["removed"] += len(moderation.succeeded)
+        totals["failed"] += len(moderation.failed)
+        if moderation.failed:
+            exit_code = EXIT_PARTIAL
+
+    if client_pool.scheduler is not None:
+        totals["quota_used"] = client_pool.scheduler.usage.used
+    out.emit("summary", dry_run=args.dry_run, **totals)
+    return exit_code
+
+
+def run_resume(args: argparse.Namespace, client_pool: YouTubeClientPool, service: CommentsService, out: Output) -> int:
+    exit_code = EXIT_OK
+    totals = {"jobs": 0, "removed": 0, "failed": 0}
+
+    for job in service.pending_jobs():
+        out.emit("job", job_id=job.job_id, created_at=job.created_at, comments=len(job.comment_ids), remaining=len(job.remaining))
+        totals["jobs"] += 1
+        if args.discard:
+            service.discard_job(job)
+            continue
+
+        moderation = service.resume(client_pool, job)
+        for result in moderation.results:
+            out.emit("removed", id=result.comment_id, ok=result.ok, error=result.error, attempts=result.attempts)
+        totals["removed"] += len(moderation.succeeded)
+        totals["failed"] += len(moderation.failed)
+        if moderation.failed:
+            exit_code = EXIT_PARTIAL
+
+    out.emit("summary", discarded=args.discard, **totals)
+    return exit_code
+
+
+def export_metrics(path: str) -> None:
+    try:
+        metrics.export(path, "prometheus" if path.endswith(".prom") else "json")
+    except OSError as e:
+        logger(f"Metrics failed to export: {e}", 'ERROR')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core", description="Headless YouTube comments remover.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sweep = subparsers.add_parser("sweep", help="Load, classify and remove flagged comments.")
+    sweep.add_argument("--video", action="append", help="Video URL or id. Repeatable.")
+    sweep.add_argument("--channel", action="append", help="Channel URL, id (UC...) or handle (@name). Repeatable.")
+    sweep.add_argument("--dry-run", action="store_true", help="Report flagged comments without removing them.")
+    sweep.add_argument("--ban-author", action="store_true")
+    sweep.add_argument("--auto-only", action="store_true", help="Remove only the auto-remove tier, leave the review tier.")
+    sweep.add_argument("--no-store", action="store_true", help="Ignore the local comment store.")
+    sweep.add_argument("--json", action="store_true", help="Print one JSON object per line.")
+    sweep.add_argument("--metrics", metavar="PATH", help="Record per-stage timings and write them to PATH (.prom for Prometheus, JSON otherwise).")
+
+    resume = subparsers.add_parser("resume", help="Finish removals interrupted in an earlier run.")
+    resume.add_argument("--discard", action="store_true", help="Drop unfinished removals instead of finishing them.")
+    resume.add_argument("--no-store", action="store_true", help="Ignore the local comment store.")
+    resume.add_argument("--json", action="store_true", help="Print one JSON object per line.")
+    resume.set_defaults(metrics=None)
+
+    args = parser.parse_args(argv)
+    out = Output(args.json)
+
+    if args.command == "sweep":
+        videos = [parse_video_id(v) for v in args.video or []]
+        channels = [parse_channel(c) for c in args.channel or []]
+        if not videos and not channels:
+            parser.error("give at least one --video or --channel")
+        if None in videos or None in channels:
+            parser.error("invalid --video or --channel value")
+        args.video, args.channel = videos, channels
+    if args.metrics:
+        metrics.enabled = True
+
+    try:
+        client_pool = connect()
+    except Exception as e:
+        logger(f"Saved credentials could not be used: {e}", 'WARNING')
+        client_pool = None
+    if client_pool is None:
+        out.emit("error", reason="not_authenticated", message="No usable saved credentials, authenticate in the app first.")
+        return EXIT_AUTH
+
+    service = create_service(use_store=not args.no_store, with_model=args.command == "sweep")
+    if service is None:
+        out.emit("error", reason="model", message="Model failed to load.")
+        return EXIT_ERROR
+
+    try:
+        if args.command == "resume":
+            return run_resume(args, client_pool, service, out)
+        return run_sweep(args, client_pool, service, out)
+
+    except KeyboardInterrupt:
+        service.cancel()
+        out.emit("error", reason="interrupted")
+        return EXIT_INTERRUPTED
+
+    except HttpError as e:
+        logger(f"Headless {args.command} failed: {e}", 'ERROR')
+        out.emit("error", reason="api", status=e.resp.status, message=str(e))
+        return EXIT_API
+
+    except Exception as e:
+        logger(f"Headless {args.command} failed: {e}", 'ERROR')
+        out.emit("error", reason="unexpected", message=str(e))
+        return EXIT_ERROR
+
+    finally:
+        if args.metrics:
+            export_metrics(args.metrics)
+        flush_logs()
@@ -0,0 +1,335 @@
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from config.config import Config
+from utils.channel_sweep import ChannelSweep, SweepReport, VideoSweepResult, list_channel_videos
+from utils.comment_fetcher import CommentPageFetcher, FetchProgress
+from utils.comment_normalizer import normalize_comments
+from utils.comment_table import CommentTable, column
+from utils.assets_loader import model_path
+from utils.batch_inference import BatchPredictor
+from utils.comment_store import CommentStore, IncrementalSync
+from utils.logger import logger
+from utils.metrics import count, observe, timed
+from utils.moderation_engine import ModerationEngine, ModerationReport
+from utils.moderation_journal import ModerationJob, ModerationJournal
+from utils.near_duplicates import NearDuplicateIndex
+from utils.quota_scheduler import PRIORITY_MODERATION, QuotaEstimate, QuotaExceeded
+from utils.streaming_classifier import ClassifierStats, StreamingClassifier
+from utils.youtube_client import YouTubeClientPool
+
+if TYPE_CHECKING:
+    from sklearn.base import BaseEstimator
+
+
+PageCallback = Callable[[List[Dict[str, str]], List[Dict[str, str]], Optional[str]], None]
+
+
+@dataclass
+class LoadReport:
+    video_id: str
+    comments: int = 0
+    cached: int = 0
+    cancelled: bool = False
+    quota_paused: bool = False
+    progress: FetchProgress = field(default_factory=FetchProgress)
+    reply_errors: List[Tuple[str, str]] = field(default_factory=list)
+
+
+class CommentsService:
+    def __init__(self,
+                 model_handle: "Future[Optional[BaseEstimator]]",
+                 classifier: Optional[StreamingClassifier] = None,
+                 store: Optional[CommentStore] = None,
+                 journal: Optional[ModerationJournal] = None) -> None:
+        self.model_handle = model_handle
+        self.classifier = classifier
+        self.store = store
+        self.journal = journal
+
+        self._active = None
+        self._lock = threading.Lock()
+        self._predictor: Optional[BatchPredictor] = None
+
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._active is not None:
+                self._active.cancel()
+
+
+    def describe_progress(self, progress: FetchProgress) -> str:
+        text = progress.describe()
+        if self.classifier is not None and self.classifier.model_ready:
+            text += f" | {self.classifier.stats.describe()}"
+        return text
+
+
+    def load_video(self, client_pool: YouTubeClientPool, video_id: str, on_page: Optional[PageCallback] = None) -> LoadReport:
+        # on_page receives (newer, older, progress): comments newer than the stored ones, then everything else.
+        fetcher = CommentPageFetcher(
+            client_pool,
+            video_id,
+            prefetch=Config.PAGE_PREFETCH,
+            replies=Config.LOAD_REPLIES,
+            reply_workers=Config.REPLY_WORKERS
+        )
+        report = LoadReport(video_id)
+        self._begin(fetcher)
+
+        sync = None
+        complete = False
+        try:
+            if self.store is not None:
+                sync = IncrementalSync(self.store, video_id, recheck_pages=Config.SYNC_RECHECK_PAGES)
+                fetcher.reply_filter = sync.threads_to_fetch        # Skips threads whose replies are all stored.
+                cached = self.store.load(video_id)
+                report.cached = report.comments = len(cached)
+                if cached:
+                    self._emit([], cached, f"{len(cached)} comment(s) from the local store", on_page)
+
+            for page in fetcher:
+                newer, older = sync.accept(page) if sync is not None else ([], page)
+                report.comments += len(newer) + len(older)
+                self._emit(newer, older, self.describe_progress(fetcher.progress), on_page)
+                if sync is not None and sync.done:
+                    fetcher.stop()      # Replies still being fetched keep arriving.
+
+            complete = not fetcher.cancelled
+
+        except QuotaExceeded as e:
+            # Stop loading but keep what arrived; the rest of the budget is for moderation.
+            logger(f"Loading paused: {e}", 'WARNING')
+            report.quota_paused = True
+
+        finally:
+            if sync is not None:
+                try:
+                    sync.finish(complete)
+                except Exception as e:
+                    logger(f"Failed to update the comment store: {e}", 'WARNING')
+            self._end()
+
+        report.cancelled = fetcher.cancelled
+        report.progress = fetcher.progress
+        report.reply_errors = fetcher.reply_errors
+        observe("load_seconds", fetcher.progress.elapsed)
+        self._log_quota(client_pool)
+        return report
+
+
+    def sweep_channel(self,
+                      client_pool: YouTubeClientPool,
+                      channel: str,
+                      on_page: Optional[PageCallback] = None,
+                      on_video: Optional[Callable[[VideoSweepResult, int, int], None]] = None) -> Tuple[SweepReport, bool]:
+        sweep = ChannelSweep(
+            client_pool,
+            max_workers=Config.SWEEP_WORKERS,
+            prefetch=Config.PAGE_PREFETCH,
+            replies=Config.LOAD_REPLIES,
+            reply_workers=Config.REPLY_WORKERS
+        )
+        self._begin(sweep)
+        try:
+            video_ids = list_channel_videos(client_pool, channel, limit=Config.SWEEP_MAX_VIDEOS)
+            logger(f"Sweeping {len(video_ids)} video(s) of {channel}.", 'INFO')
+            report = sweep.run(video_ids, on_page=lambda _, page: self._emit([], page, None, on_page), on_video=on_video)
+
+        finally:
+            self._end()
+
+        for result in report.results:
+            if result.error is not None:
+                logger(f"Video {result.video_id} skipped: {result.error}", 'WARNING')
+            else:
+                logger(f"Video {result.video_id}: {result.comments} comment(s) in {result.elapsed:.1f}s ({result.rate:.0f}/s).", 'INFO')
+        logger(f"Channel sweep: {report.describe()}", 'INFO')
+        observe("sweep_seconds", report.elapsed)
+        self._log_quota(client_pool)
+        return report, sweep.cancelled
+
+
+    def flag(self, comments: Union[CommentTable, List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        model = self.model_handle.result()       # Waits only if the model is still loading.
+        if model is None:
+            raise RuntimeError("Model failed to load.")
+
+        if self.classifier is not None and self.classifier.started:
+            with timed("classifier_drain_seconds"):
+                flagged_comments = self.classifier.wait()        # Classified while loading.
+            stats = self.classifier.stats
+
+        else:
+            with timed("normalize_seconds"):
+                texts = normalize_comments(column(comments, "text"), workers=Config.NORMALIZER_WORKERS)
+            # Whole sets go through chunked, multi-process scoring instead of one huge predict call.
+            classifier = self.classifier or StreamingClassifier(self.model_handle)
+            classifier.index = self._new_index()
+            classifier.stats = stats = ClassifierStats()
+            flagged_comments = classifier.classify(comments, texts, stats, self._batch_predictor(model).scores)
+
+        logger(f"Classified {stats.classified} comment(s) in {stats.inference_time:.2f}s, {stats.flagged} flagged.", 'INFO')
+        logger(stats.describe_stages(), 'INFO')
+
+        if self.classifier is not None and self.classifier.cache is not None:
+            logger(self.classifier.cache.stats.describe(), 'INFO')
+        if self.classifier is not None and self.classifier.index is not None:
+            logger(self.classifier.index.stats.describe(), 'INFO')
+
+        if any("video_id" in c for c in flagged_comments):
+            flagged_comments.sort(key=lambda c: c.get("video_id", ""))      # Group a channel sweep by video.
+        return flagged_comments
+
+
+    def estimate_removal(self, client_pool: YouTubeClientPool, count: int) -> Optional[QuotaEstimate]:
+        if client_pool.scheduler is None:
+            return None
+        return client_pool.scheduler.estimate_moderation(count, Config.MODERATION_IDS_PER_CALL)
+
+
+    def remove(self,
+               client_pool: YouTubeClientPool,
+               comment_ids: List[str],
+               ban_author: bool = False,
+               on_progress: Optional[Callable[[int, int], None]] = None,
+               job: Optional[ModerationJob] = None) -> ModerationReport:
+        # Journaled before the first call, so an interrupted run can be resumed from where it stopped.
+        if job is None:
+            job = self._journal(lambda journal: journal.begin(comment_ids, ban_author))
+        on_results = (lambda results: self._journal(lambda journal: journal.record(job, results))) if job is not None else None
+
+        engine = ModerationEngine(
+            client_pool,
+            ids_per_call=Config.MODERATION_IDS_PER_CALL,
+            max_workers=Config.MODERATION_WORKERS,
+            max_retries=Config.MODERATION_MAX_RETRIES,
+            backoff=Config.MODERATION_BACKOFF,
+            calls_per_batch=Config.MODERATION_CALLS_PER_BATCH
+        )
+        report = engine.run(comment_ids, ban_author=ban_author, on_progress=on_progress, on_results=on_results)
+        observe("remove_seconds", report.elapsed)
+        count("comments_removed", len(report.succeeded))
+        count("comments_remove_failed", len(report.failed))
+        logger(client_pool.metrics.describe(), 'INFO')
+        logger(f"Removed {len(report.succeeded)} comments in {report.elapsed:.1f}s ({report.ids_per_second:.1f} ids/s)", 'INFO')
+        for result in report.failed:
+            logger(f"Failed to remove comment with id: {result.comment_id} ({result.error})", 'ERROR')
+
+        self._mark_removed(report.succeeded)
+        self._log_quota(client_pool)
+        if job is not None and not report.failed:
+            self._journal(lambda journal: journal.end(job))
+        return report
+
+
+    def pending_jobs(self) -> List[ModerationJob]:
+        return self.journal.pending() if self.journal is not None else []
+
+
+    def resume(self,
+               client_pool: YouTubeClientPool,
+               job: ModerationJob,
+               on_progress: Optional[Callable[[int, int], None]] = None) -> ModerationReport:
+        # Ids the journal or the store already has as removed are not sent again. Ids that were in flight
+        # when the run stopped are sent again; rejecting a rejected comment leaves it as it is.
+        remaining = job.remaining
+        if self.store is not None and remaining:
+            rejected = self.store.ids_with_status(remaining, "rejected")
+            if rejected:
+                self._journal(lambda journal: journal.mark_done(job, rejected))
+                remaining = [i for i in remaining if i not in rejected]
+        logger(f"Resuming moderation job {job.job_id}: {len(remaining)} of {len(job.comment_ids)} comment(s) left.", 'INFO')
+
+        return self.remove(client_pool, remaining, ban_author=job.ban_author, on_progress=on_progress, job=job)
+
+
+    def discard_job(self, job: ModerationJob) -> None:
+        logger(f"Discarded moderation job: {job.describe()}", 'INFO')
+        self._journal(lambda journal: journal.end(job))
+
+
+    def remove_one(self, client_pool: YouTubeClientPool, comment_id: str, ban_author: bool = False) -> None:
+        with client_pool.lease(PRIORITY_MODERATION) as youtube:
+            youtube.comments().setModerationStatus(
+                id=comment_id,
+                moderationStatus="rejected",
+                banAuthor=ban_author
+            ).execute()
+        logger(f"Removed comment with id: {comment_id}", 'INFO')
+        self._mark_removed([comment_id])
+
+
+    def _batch_predictor(self, model: "BaseEstimator") -> BatchPredictor:
+        if self._predictor is None or self._predictor.model is not model:
+            self._predictor = BatchPredictor(
+                model,
+                model_path(model),
+                workers=Config.INFERENCE_WORKERS,
+                chunk_size=Config.INFERENCE_CHUNK_SIZE
+            )
+        return self._predictor
+
+
+    def _score_backlog(self, texts: List[str]) -> Sequence[float]:
+        # Called from the classifier once the model is loaded. Batches below the parallel threshold
+        # are scored in-process, so only a large backlog starts the worker pool.
+        return self._batch_predictor(self.model_handle.result()).scores(texts)
+
+
+    def _new_index(self) -> Optional[NearDuplicateIndex]:
+        if not Config.DUPLICATE_CLUSTERING:
+            return None
+        return NearDuplicateIndex(Config.DUPLICATE_THRESHOLD, Config.DUPLICATE_PROPAGATE_THRESHOLD)
+
+
+    def _begin(self, job) -> None:
+        with self._lock:
+            self._active = job
+        if self.classifier is not None:
+            self.classifier.start(self._new_index(), self._score_backlog)
+
+
+    def _end(self) -> None:
+        with self._lock:
+            self._active = None
+        if self.classifier is not None:
+            self.classifier.finish()
+
+
+    def _emit(self,
+              newer: List[Dict[str, str]],
+              older: List[Dict[str, str]],
+              progress: Optional[str],
+              on_page: Optional[PageCallback]) -> None:
+        if self.classifier is not None and (newer or older):
+            self.classifier.submit(newer + older)
+        if on_page is not None:
+            on_page(newer, older, progress)
+
+
+    def _log_quota(self, client_pool: YouTubeClientPool) -> None:
+        if client_pool.scheduler is not None:
+            logger(client_pool.scheduler.usage.describe(), 'INFO')
+
+
+    def _journal(self, write: Callable[[ModerationJournal], Optional[ModerationJob]]) -> Optional[ModerationJob]:
+        # A journal that cannot be written must not stop a removal.
+        if self.journal is None:
+            return None
+        try:
+            return write(self.journal)
+        except Exception as e:
+            logger(f"Failed to write the moderation journal: {e}", 'WARNING')
+            return None
+
+
+    def _mark_removed(self, comment_ids: List[str]) -> None:
+        # Removed comments must not come back from the local store on the next load.
+        if self.store is None:
+            return
+        try:
+            self.store.set_moderation_status(comment_ids, "rejected")
+        except Exception as e:
+            logger(f"Failed to update the comment store: {e}", 'WARNING')
@@ -0,0 +1,531 @@
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+
+import argparse
+import gc
+import json
+import os
+import random
+import time
+import tracemalloc
+import numpy as np
+from concurrent.futures import Future
+from typing import Dict, List
+from config.config import Config
+from core.service import CommentsService
+from modules.fake_youtube import FakeYouTube, synthetic_channel, synthetic_comments
+from utils.batch_inference import BatchPredictor
+from utils.channel_sweep import ChannelSweep, list_channel_videos
+from utils.comment_normalizer import normalize_comment, normalize_comments
+from utils.comment_table import CommentTable
+from utils.assets_loader import load_tier_policy
+from utils.compact_model import CompactTextClassifier
+from utils.flagged_store import FlaggedStore
+from utils.moderation_engine import ModerationEngine
+from utils.near_duplicates import NearDuplicateIndex
+from utils.prediction_cache import model_fingerprint
+from utils.quota_scheduler import QuotaScheduler
+from utils.spam_tiers import spam_scores
+from utils.streaming_classifier import ClassifierStats, StreamingClassifier
+from utils.youtube_client import YouTubeClientPool
+
+
+def bench_moderation(args: argparse.Namespace) -> List[Dict]:
+    comment_ids = [f"Ugx{i:09d}" for i in range(args.count)]
+    variants = {
+        "sequential": dict(ids_per_call=1, max_workers=1),
+        "multi_id": dict(ids_per_call=Config.MODERATION_IDS_PER_CALL, max_workers=Config.MODERATION_WORKERS),
+        "batch_http": dict(ids_per_call=Config.MODERATION_IDS_PER_CALL, max_workers=Config.MODERATION_WORKERS, calls_per_batch=10),
+    }
+
+    results = []
+    for name, options in variants.items():
+        youtube = FakeYouTube(latency=args.latency, error_rate=args.error_rate)
+        client_pool = YouTubeClientPool(lambda: youtube, size=Config.CLIENT_POOL_SIZE)
+        report = ModerationEngine(client_pool, backoff=args.latency, **options).run(comment_ids)
+        results.append({
+            "benchmark": "moderation",
+            "variant": name,
+            "count": args.count,
+            "elapsed_s": round(report.elapsed, 4),
+            "ids_per_s": round(report.ids_per_second, 1),
+            "failed": len(report.failed),
+            "api_calls": sum(youtube.calls.values()),
+        })
+    return results
+
+
+def bench_normalizer(args: argparse.Namespace) -> List[Dict]:
+    workers = max(2, args.workers)      # One worker would normalize in-process.
+    results = []
+    for count in args.sizes:
+        texts = [c["text"] for c in synthetic_comments(count, seed=count)]
+        variants = {
+            "per_comment": lambda: [normalize_comment(t) for t in texts],
+            "batch": lambda: normalize_comments(texts),
+            # No threshold, so every size goes through the process pool it is named for.
+            "batch_processes": lambda: normalize_comments(texts, workers=workers, parallel_threshold=0),
+        }
+
+        expected = None
+        for name, run in variants.items():
+            started_at = time.perf_counter()
+            normalized = run()
+            elapsed = time.perf_counter() - started_at
+            expected = expected or normalized
+            results.append({
+                "benchmark": "normalizer",
+                "variant": name,
+                "count": count,
+                "elapsed_s": round(elapsed, 4),
+                "texts_per_s": round(count / elapsed, 1),
+                "matches": normalized == expected,
+            })
+    return results
+
+
+def bench_model(args: argparse.Namespace) -> List[Dict]:
+    from joblib import load
+    texts = normalize_comments([c["text"] for c in synthetic_comments(args.count)])
+    loaders = {
+        "pickle": lambda: load(Config.MODEL_PATH),
+        "compact": lambda: CompactTextClassifier.load(Config.COMPACT_MODEL_PATH),
+    }
+
+    results = []
+    for name, load_model in loaders.items():
+        tracemalloc.start()
+        started_at = time.perf_counter()
+        model = load_model()
+        load_time = time.perf_counter() - started_at
+        load_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        started_at = time.perf_counter()
+        model.predict(texts)
+        predict_time = time.perf_counter() - started_at
+        results.append({
+            "benchmark": "model",
+            "variant": name,
+            "count": args.count,
+            "load_s": round(load_time, 4),
+            "load_mb": round(load_memory / 2**20, 2),
+            "predict_s": round(predict_time, 4),
+            "texts_per_s": round(args.count / predict_time, 1),
+        })
+    return results
+
+
+def bench_inference(args: argparse.Namespace) -> List[Dict]:
+    if args.model == "pickle":
+        from joblib import load
+        path = Config.MODEL_PATH
+        model = load(path)
+    else:
+        path = Config.COMPACT_MODEL_PATH
+        model = CompactTextClassifier.load(path)
+
+    results = []
+    for count in args.sizes:
+        texts = normalize_comments([c["text"] for c in synthetic_comments(count, seed=count)])
+        # Distinct texts, so neither caching nor clustering can hide the model's cost.
+        texts = [f"{text} {i}" for i, text in enumerate(texts)]
+
+        variants = {"single_call": lambda: spam_scores(model, texts)}
+        predictors = []
+        for workers in args.workers:
+            predictor = BatchPredictor(model, path, workers=workers, chunk_size=args.chunk_size, parallel_threshold=0)
+            predictor.scores(texts[:workers * args.chunk_size])     # Start the workers and load the model outside the timing.
+            predictors.append(predictor)
+            variants[f"chunked_{workers}_workers"] = lambda predictor=predictor: predictor.scores(texts)
+
+        expected = None
+        for name, run in variants.items():
+            started_at = time.perf_counter()
+            scores = run()
+            elapsed = time.perf_counter() - started_at
+            expected = scores if expected is None else expected
+            result = {
+                "benchmark": "inference",
+                "variant": name,
+                "model": args.model,
+                "count": count,
+                "elapsed_s": round(elapsed, 4),
+                "texts_per_s": round(count / elapsed, 1),
+                "matches": bool(np.allclose(scores, expected)),
+            }
+
+            if args.memory:
+                # A second, traced run: tracing slows this process down but not the workers.
+                tracemalloc.start()
+                run()
+                result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)      # This process only.
+                tracemalloc.stop()
+            results.append(result)
+
+        for predictor in predictors:
+            predictor.close()
+    return results
+
+
+def bench_tiers(args: argparse.Namespace) -> List[Dict]:
+    if args.model == "pickle":
+        from joblib import load
+        model = load(Config.MODEL_PATH)
+    else:
+        model = CompactTextClassifier.load(Config.COMPACT_MODEL_PATH)
+    model_handle = Future()
+    model_handle.set_result(model)
+
+    results = []
+    for count in args.sizes:
+        comments = synthetic_comments(count, spam_ratio=args.spam_ratio, seed=count)
+        texts = normalize_comments([c["text"] for c in comments])
+
+        started_at = time.perf_counter()
+        expected = spam_scores(model, texts) > Config.REVIEW_THRESHOLD
+        model_time = time.perf_counter() - started_at
+
+        # The keyword stage alone, without clustering or caching in front of the model.
+        classifier = StreamingClassifier(model_handle, policy=load_tier_policy())
+        stats = ClassifierStats()
+        flagged = {c["id"] for c in classifier.classify(comments, texts, stats)}
+
+        results.append({
+            "benchmark": "tiers",
+            "model": args.model,
+            "count": count,
+            "model_only_s": round(model_time, 4),
+            "tiered_s": round(stats.inference_time, 4),
+            "keyword_s": round(stats.keyword_time, 4),
+            "scoring_s": round(stats.scoring_time, 4),
+            "keyword_hits": stats.keyword_hits,
+            "scored": stats.scored,
+            "auto": stats.auto,
+            "review": stats.review,
+            "keep": stats.classified - stats.flagged,
+            # Against the synthetic ground truth.
+            "model_errors": sum(1 for c, e in zip(comments, expected) if bool(e) != c["spam"]),
+            "tiered_errors": sum(1 for c in comments if (c["id"] in flagged) != c["spam"]),
+        })
+    return results
+
+
+def bench_duplicates(args: argparse.Namespace) -> List[Dict]:
+    if args.model == "pickle":
+        from joblib import load
+        model = load(Config.MODEL_PATH)
+    else:
+        model = CompactTextClassifier.load(Config.COMPACT_MODEL_PATH)
+
+    results = []
+    for count in args.sizes:
+        # Spam waves: the same templates with emoji, spacing and punctuation varied per copy.
+        rng = random.Random(count)
+        texts = [c["text"] for c in synthetic_comments(count, spam_ratio=args.spam_ratio, seed=count)]
+        texts = [t.replace(" ", "  " if rng.random() < 0.3 else " ") + rng.choice(["", "!", " 🔥", " 🔥🔥", "..."]) for t in texts]
+        texts = normalize_comments(texts)
+
+        started_at = time.perf_counter()
+        expected = [int(p) for p in model.predict(texts)]
+        direct_time = time.perf_counter() - started_at
+
+        index = NearDuplicateIndex(Config.DUPLICATE_THRESHOLD, Config.DUPLICATE_PROPAGATE_THRESHOLD)
+        started_at = time.perf_counter()
+        labels = []
+        for i in range(0, count, args.page_size):
+            labels.extend(index.predict(model.predict, texts[i:i + args.page_size])[0])
+        clustered_time = time.perf_counter() - started_at
+
+        results.append({
+            "benchmark": "duplicates",
+            "model": args.model,
+            "count": count,
+            "direct_s": round(direct_time, 4),
+            "clustered_s": round(clustered_time, 4),
+            "texts_per_s": round(count / clustered_time, 1),
+            "clusters": index.stats.clusters,
+            "scored": index.stats.predicted,
+            "disagreements": sum(a != b for a, b in zip(labels, expected)),
+        })
+    return results
+
+
+def bench_review(args: argparse.Namespace) -> List[Dict]:
+    # Cancelling part of the flagged set in the confirmation dialog, without the Treeview.
+    results = []
+    for count in args.sizes:
+        comments = synthetic_comments(count, spam_ratio=1.0, seed=count)
+        cancelled = [c["id"] for c in comments[::max(1, round(1 / args.cancel_ratio))]]
+
+        flagged = list(comments)
+        started_at = time.perf_counter()
+        for comment_id in cancelled:
+            flagged[:] = [c for c in flagged if c["id"] != comment_id]
+        per_row_time = time.perf_counter() - started_at
+
+        store = FlaggedStore(comments)
+        started_at = time.perf_counter()
+        store.remove(cancelled)
+        bulk_time = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        matches = store.ids_matching(comments[0]["text"][:10])
+        match_time = time.perf_counter() - started_at
+
+        results.append({
+            "benchmark": "review",
+            "count": count,
+            "cancelled": len(cancelled),
+            "per_row_s": round(per_row_time, 4),
+            "bulk_s": round(bulk_time, 6),
+            "match_s": round(match_time, 4),
+            "matches": len(matches),
+            "remaining": len(store),
+        })
+    return results
+
+
+def bench_memory(args: argparse.Namespace) -> List[Dict]:
+    # Memory kept by loaded comments, one dict each against the columnar table, and the flag
+    # path over each. Comments are generated while tracing so their strings are counted too.
+    from joblib import load
+    model_handle = Future()
+    model_handle.set_result(load(Config.MODEL_PATH))
+
+    results = []
+    for count in args.sizes:
+        for layout in ("dicts", "table"):
+            gc.collect()
+            tracemalloc.start()
+            comments = synthetic_comments(count, spam_ratio=args.spam_ratio, seed=count)
+            for comment in comments:
+                del comment["spam"]         # Not something the API returns.
+            if layout == "table":
+                comments = CommentTable(comments)
+            gc.collect()
+            retained = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            service = CommentsService(model_handle)
+            started_at = time.perf_counter()
+            flagged = service.flag(comments)
+            flag_time = time.perf_counter() - started_at
+
+            results.append({
+                "benchmark": "memory",
+                "layout": layout,
+                "count": count,
+                "retained_mb": round(retained / 2**20, 1),
+                "per_100k_mb": round(retained / 2**20 * 100_000 / count, 1),
+                "flag_s": round(flag_time, 4),
+                "flagged": len(flagged),
+            })
+            del comments, flagged
+    return results
+
+
+def bench_channel(args: argparse.Namespace) -> List[Dict]:
+    channels = synthetic_channel(args.videos, args.comments, max_replies=args.max_replies)
+    channel_id, videos = next(iter(channels.items()))
+    model = CompactTextClassifier.load(Config.COMPACT_MODEL_PATH)
+
+    def classify(page: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        predictions = model.predict(normalize_comments([c["text"] for c in page]))
+        return [c for c, p in zip(page, predictions) if p == 1]
+
+    results = []
+    for workers in args.workers:
+        youtube = FakeYouTube(videos=videos, latency=args.latency, channels={channel_id: list(videos)})
+        client_pool = YouTubeClientPool(lambda: youtube, size=workers)
+        video_ids = list_channel_videos(client_pool, channel_id)
+        report = ChannelSweep(client_pool, max_workers=workers, classify=classify).run(video_ids)
+        per_video = [r.rate for r in report.results if r.comments]
+        results.append({
+            "benchmark": "channel",
+            "workers": workers,
+            "videos": len(report.results),
+            "comments": report.comments,
+            "flagged": len(report.flagged),
+            "failed": len(report.failed),
+            "elapsed_s": round(report.elapsed, 4),
+            "comments_per_s": round(report.rate, 1),
+            "video_comments_per_s": round(sum(per_video) / len(per_video), 1) if per_video else 0.0,
+            "api_calls": sum(youtube.calls.values()),
+        })
+    return results
+
+
+def bench_e2e(args: argparse.Namespace) -> List[Dict]:
+    if args.model == "pickle":
+        from joblib import load
+        model = load(Config.MODEL_PATH)
+    else:
+        model = CompactTextClassifier.load(Config.COMPACT_MODEL_PATH)
+    model_handle = Future()
+    model_handle.set_result(model)
+
+    results = []
+    for count in args.sizes:
+        comments = synthetic_comments(count, spam_ratio=args.spam_ratio, seed=count, max_replies=args.max_replies)
+        youtube = FakeYouTube(videos={"benchmark01": comments}, latency=args.latency, page_size=args.page_size, error_rate=args.error_rate)
+        scheduler = QuotaScheduler(daily_quota=10**9, rate=10**9, burst=10**6)       # Accounting only.
+        client_pool = YouTubeClientPool(lambda: youtube, size=Config.CLIENT_POOL_SIZE, scheduler=scheduler)
+        service = CommentsService(model_handle, StreamingClassifier(model_handle, policy=load_tier_policy()))
+
+        loaded = CommentTable()
+        started_at = time.perf_counter()
+        report = service.load_video(client_pool, "benchmark01", on_page=lambda newer, older, progress: loaded.extend(newer + older))
+        load_time = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        flagged = service.flag(loaded)
+        flag_time = time.perf_counter() - started_at
+
+        moderation = service.remove(client_pool, [c["id"] for c in flagged])
+        total_time = load_time + flag_time + moderation.elapsed
+
+        spam = {c["id"] for c in comments if c["spam"]} | {r["id"] for c in comments for r in c.get("replies", []) if r["spam"]}
+        flagged_ids = {c["id"] for c in flagged}
+        results.append({
+            "benchmark": "e2e",
+            "model": args.model,
+            "count": count,
+            "comments": len(loaded),
+            "flagged": len(flagged),
+            "recall": round(len(flagged_ids & spam) / len(spam), 4) if spam else 1.0,
+            "precision": round(len(flagged_ids & spam) / len(flagged_ids), 4) if flagged_ids else 1.0,
+            "load_s": round(load_time, 4),
+            "flag_wait_s": round(flag_time, 4),
+            "classify_s": round(service.classifier.stats.inference_time, 4),
+            "remove_s": round(moderation.elapsed, 4),
+            "total_s": round(total_time, 4),
+            "comments_per_s": round(len(loaded) / total_time, 1),
+            "removed": len(moderation.succeeded),
+            "failed": len(moderation.failed),
+            "api_calls": sum(youtube.calls.values()),
+            "quota_units": scheduler.usage.used,
+        })
+    return results
+
+
+RESULT_KEY_FIELDS = ("benchmark", "variant", "model", "layout", "count", "workers")
+
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[Dict]:
+    # Results match on the fields that set up a run; "per_s" metrics should rise, other "_s" ones fall.
+    identity = lambda r: tuple((k, r.get(k)) for k in RESULT_KEY_FIELDS)
+    previous = {identity(r): r for r in baseline}
+    for result in results:
+        old = previous.get(identity(result))
+        if old is None:
+            continue
+        regressions = []
+        for key, value in result.items():
+            if not key.endswith("_s") or not isinstance(old.get(key), (int, float)) or not old[key]:
+                continue
+            change = (value - old[key]) / old[key]
+            if (key.endswith("per_s") and change < -tolerance) or (not key.endswith("per_s") and change > tolerance):
+                regressions.append(f"{key} {change:+.0%}")
+        result["regressions"] = regressions
+    return results
+
+
+def environment() -> Dict:
+    return {
+        "benchmark": "environment",
+        "python": sys.version.split()[0],
+        "cpus": os.cpu_count(),
+        "model": model_fingerprint(Config.MODEL_PATH) if Config.MODEL_PATH.exists() else None,
+        "compact_model": model_fingerprint(Config.COMPACT_MODEL_PATH) if Config.COMPACT_MODEL_PATH.exists() else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Performance benchmarks for the app services.")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per result.")
+    parser.add_argument("--output", type=Path, help="Also write the results to this JSON file.")
+    parser.add_argument("--baseline", type=Path, help="Flag regressions against an earlier --output file.")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before a metric counts as a regression.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    moderation = subparsers.add_parser("moderation")
+    moderation.add_argument("--count", type=int, default=3000)
+    moderation.add_argument("--latency", type=float, default=0.05)
+    moderation.add_argument("--error-rate", type=float, default=0.01)
+    moderation.set_defaults(run=bench_moderation)
+
+    normalizer = subparsers.add_parser("normalizer")
+    normalizer.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    normalizer.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 1), help="Processes for batch_processes; at least 2.")
+    normalizer.set_defaults(run=bench_normalizer)
+
+    model = subparsers.add_parser("model")
+    model.add_argument("--count", type=int, default=100_000)
+    model.set_defaults(run=bench_model)
+
+    inference = subparsers.add_parser("inference", help="One predict call against chunked multi-process inference.")
+    inference.add_argument("--sizes", type=int, nargs="+", default=[100_000, 500_000])
+    inference.add_argument("--model", choices=["pickle", "compact"], default="pickle")
+    inference.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    inference.add_argument("--chunk-size", type=int, default=Config.INFERENCE_CHUNK_SIZE)
+    inference.add_argument("--memory", action="store_true", help="Also report peak memory, from a second traced run.")
+    inference.set_defaults(run=bench_inference)
+
+    tiers = subparsers.add_parser("tiers", help="Keyword pre-filter and score tiers against scoring every comment.")
+    tiers.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    tiers.add_argument("--model", choices=["pickle", "compact"], default="pickle")
+    tiers.add_argument("--spam-ratio", type=float, default=0.3)
+    tiers.set_defaults(run=bench_tiers)
+
+    duplicates = subparsers.add_parser("duplicates", help="Near-duplicate clustering against scoring every comment.")
+    duplicates.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    duplicates.add_argument("--model", choices=["pickle", "compact"], default="pickle")
+    duplicates.add_argument("--page-size", type=int, default=100)
+    duplicates.add_argument("--spam-ratio", type=float, default=0.3)
+    duplicates.set_defaults(run=bench_duplicates)
+
+    review = subparsers.add_parser("review", help="Bulk cancel in the flagged store against rebuilding the list per row.")
+    review.add_argument("--sizes", type=int, nargs="+", default=[5_000, 20_000])
+    review.add_argument("--cancel-ratio", type=float, default=0.1)
+    review.set_defaults(run=bench_review)
+
+    memory = subparsers.add_parser("memory", help="Memory of loaded comments as dicts against the columnar table.")
+    memory.add_argument("--sizes", type=int, nargs="+", default=[100_000, 300_000])
+    memory.add_argument("--spam-ratio", type=float, default=0.3)
+    memory.set_defaults(run=bench_memory)
+
+    channel = subparsers.add_parser("channel")
+    channel.add_argument("--videos", type=int, default=300)
+    channel.add_argument("--comments", type=int, default=250, help="Comments per video.")
+    channel.add_argument("--max-replies", type=int, default=0, help="Up to this many replies per comment.")
+    channel.add_argument("--latency", type=float, default=0.05)
+    channel.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    channel.set_defaults(run=bench_channel)
+
+    e2e = subparsers.add_parser("e2e", help="Load, classify and remove through the core service.")
+    e2e.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    e2e.add_argument("--model", choices=["pickle", "compact"], default="pickle")
+    e2e.add_argument("--latency", type=float, default=0.005)
+    e2e.add_argument("--page-size", type=int, default=100)
+    e2e.add_argument("--error-rate", type=float, default=0.0)
+    e2e.add_argument("--spam-ratio", type=float, default=0.3)
+    e2e.add_argument("--max-replies", type=int, default=0)
+    e2e.set_defaults(run=bench_e2e)
+
+    args = parser.parse_args()
+    results = [environment()] + args.run(args)
+    if args.baseline is not None:
+        results = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    for result in results:
+        print(json.dumps(result) if args.json else "  ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
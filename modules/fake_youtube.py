@@ -0,0 +1,287 @@
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+from httplib2 import Response
+from googleapiclient.errors import HttpError
+
+
+SPAM_TEMPLATES = [
+    "Main di {site} pasti gacor, maxwin tiap hari!",
+    "{site} slot gacor hari ini, deposit 10rb langsung jp",
+    "Cuma di {site} jackpot gampang cair, buruan daftar",
+    "Mampir ke {site}, rtp live paling tinggi bosku",
+    "Modal receh jadi jutaan di {site} 🔥🔥",
+]
+
+SPAM_SITES = ["PULAU777", "DORA77", "ALEXIS17", "SGI88", "AERO88", "WETON88", "LAZAD88"]
+
+BENIGN_TEMPLATES = [
+    "Videonya bermanfaat banget, makasih kak!",
+    "Nice video, keep it up {n}",
+    "Penjelasannya jelas dan mudah dipahami",
+    "Kapan bikin part {n}?",
+    "Audionya agak kecil ya di menit {n}",
+    "First time watching, subscribed!",
+    "Setuju banget sama pendapat di menit ke-{n}",
+]
+
+
+def synthetic_text(rng: random.Random, spam: bool) -> str:
+    if spam:
+        return rng.choice(SPAM_TEMPLATES).format(site=rng.choice(SPAM_SITES))
+    return rng.choice(BENIGN_TEMPLATES).format(n=rng.randint(1, 60))
+
+
+def synthetic_comments(count: int,
+                       spam_ratio: float = 0.3,
+                       seed: int = 0,
+                       prefix: str = "",
+                       max_replies: int = 0) -> List[Dict[str, str]]:
+    rng = random.Random(seed)
+    newest = datetime(2025, 1, 1)
+    comments = []
+    for i in range(count):
+        spam = rng.random() < spam_ratio
+        comment = {
+            "id": f"Ugx{prefix}{i:09d}",
+            "author": f"@{'promo' if spam else 'viewer'}{rng.randint(0, count // 10 + 1)}",
+            "text": synthetic_text(rng, spam),
+            "published_at": (newest - timedelta(seconds=i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "spam": spam,
+        }
+        if max_replies:
+            replies = []
+            for j in range(rng.randint(0, max_replies)):
+                reply_spam = rng.random() < spam_ratio
+                replies.append({
+                    "id": f"{comment['id']}.{j:04d}",
+                    "author": f"@{'promo' if reply_spam else 'viewer'}{rng.randint(0, count // 10 + 1)}",
+                    "text": synthetic_text(rng, reply_spam),
+                    "published_at": comment["published_at"],
+                    "spam": reply_spam,
+                })
+            comment["replies"] = replies
+        comments.append(comment)
+    return comments
+
+
+def synthetic_channel(video_count: int,
+                      comments_per_video: int,
+                      spam_ratio: float = 0.3,
+                      seed: int = 0,
+                      max_replies: int = 0) -> Dict[str, Dict[str, List[Dict[str, str]]]]:
+    videos = {
+        f"vid{i:08d}": synthetic_comments(comments_per_video, spam_ratio, seed=seed + i, prefix=f"{i:05d}", max_replies=max_replies)
+        for i in range(video_count)
+    }
+    return {"UCfakechannel00000000000": videos}
+
+
+def http_error(status: int, reason: str = "") -> HttpError:
+    return HttpError(Response({"status": status, "reason": reason}), reason.encode())
+
+
+class FakeRequest:
+    def __init__(self, api: "FakeYouTube", operation: str, fn: Callable[[], dict]) -> None:
+        self.api = api
+        self.operation = operation
+        self.fn = fn
+
+
+    def execute(self, http=None, num_retries: int = 0) -> dict:
+        self.api._round_trip()
+        return self.api._call(self.operation, self.fn)
+
+
+class FakeBatch:
+    def __init__(self, api: "FakeYouTube", callback: Optional[Callable] = None) -> None:
+        self.api = api
+        self.callback = callback
+        self.requests = []
+
+
+    def add(self, request: FakeRequest, callback: Optional[Callable] = None, request_id: Optional[str] = None) -> None:
+        self.requests.append((request_id or str(len(self.requests)), request, callback or self.callback))
+
+
+    def execute(self, http=None) -> None:
+        self.api._round_trip()
+        for request_id, request, callback in self.requests:
+            try:
+                response, exception = self.api._call(request.operation, request.fn), None
+            except HttpError as e:
+                response, exception = None, e
+            if callback is not None:
+                callback(request_id, response, exception)
+
+
+class FakeYouTube:
+    def __init__(self,
+                 videos: Optional[Dict[str, List[Dict[str, str]]]] = None,
+                 latency: float = 0.0,
+                 page_size: int = 100,
+                 error_rate: float = 0.0,
+                 invalid_ids: Optional[Set[str]] = None,
+                 seed: int = 0,
+                 channels: Optional[Dict[str, List[str]]] = None) -> None:
+        self.videos = videos or {}
+        self.channel_uploads = channels or {}
+        self.latency = latency
+        self.page_size = page_size
+        self.error_rate = error_rate
+        self.invalid_ids = invalid_ids or set()
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+        self.moderated: Dict[str, str] = {}
+        self._threads: Optional[Dict[str, Dict[str, str]]] = None
+
+
+    def thread(self, thread_id: str) -> Optional[Dict[str, str]]:
+        with self.lock:
+            if self._threads is None:
+                self._threads = {c["id"]: c for comments in self.videos.values() for c in comments}
+        return self._threads.get(thread_id)
+
+
+    def _round_trip(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+
+    def _call(self, operation: str, fn: Callable[[], dict]) -> dict:
+        with self.lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+            failed = self.error_rate and self.rng.random() < self.error_rate
+        if failed:
+            raise http_error(503, "backendError")
+        return fn()
+
+
+    def commentThreads(self) -> "_CommentThreads":
+        return _CommentThreads(self)
+
+
+    def comments(self) -> "_Comments":
+        return _Comments(self)
+
+
+    def channels(self) -> "_Channels":
+        return _Channels(self)
+
+
+    def playlistItems(self) -> "_PlaylistItems":
+        return _PlaylistItems(self)
+
+
+    def new_batch_http_request(self, callback: Optional[Callable] = None) -> FakeBatch:
+        return FakeBatch(self, callback)
+
+
+class _CommentThreads:
+    def __init__(self, api: FakeYouTube) -> None:
+        self.api = api
+
+
+    def list(self, part: str, videoId: str, maxResults: int = 20, pageToken: Optional[str] = None, **kwargs) -> FakeRequest:
+        def run() -> dict:
+            comments = self.api.videos.get(videoId, [])
+            start = int(pageToken or 0)
+            end = start + min(maxResults, self.api.page_size)
+            response = {"items": [_thread_resource(c, "replies" in part) for c in comments[start:end]]}
+            if end < len(comments):
+                response["nextPageToken"] = str(end)
+            return response
+        return FakeRequest(self.api, "commentThreads.list", run)
+
+
+class _Comments:
+    def __init__(self, api: FakeYouTube) -> None:
+        self.api = api
+
+
+    def list(self, part: str, parentId: str, maxResults: int = 20, pageToken: Optional[str] = None, **kwargs) -> FakeRequest:
+        def run() -> dict:
+            thread = self.api.thread(parentId)
+            if thread is None:
+                raise http_error(404, "commentNotFound")
+            replies = thread.get("replies", [])
+            start = int(pageToken or 0)
+            end = start + min(maxResults, 100)
+            response = {"items": [_comment_resource(r, parentId) for r in replies[start:end]]}
+            if end < len(replies):
+                response["nextPageToken"] = str(end)
+            return response
+        return FakeRequest(self.api, "comments.list", run)
+
+
+    def setModerationStatus(self, id: str, moderationStatus: str, banAuthor: bool = False) -> FakeRequest:
+        def run() -> dict:
+            ids = id.split(",")
+            if any(i in self.api.invalid_ids for i in ids):
+                raise http_error(400, "processingFailure")
+            with self.api.lock:
+                for i in ids:
+                    self.api.moderated[i] = moderationStatus
+            return {}
+        return FakeRequest(self.api, "comments.setModerationStatus", run)
+
+
+class _Channels:
+    def __init__(self, api: FakeYouTube) -> None:
+        self.api = api
+
+
+    def list(self, part: str, id: Optional[str] = None, forHandle: Optional[str] = None, **kwargs) -> FakeRequest:
+        def run() -> dict:
+            channel_id = id or forHandle
+            if channel_id not in self.api.channel_uploads:
+                return {"items": []}
+            uploads = f"UU{channel_id[2:]}"
+            return {"items": [{"id": channel_id, "contentDetails": {"relatedPlaylists": {"uploads": uploads}}}]}
+        return FakeRequest(self.api, "channels.list", run)
+
+
+class _PlaylistItems:
+    def __init__(self, api: FakeYouTube) -> None:
+        self.api = api
+
+
+    def list(self, part: str, playlistId: str, maxResults: int = 5, pageToken: Optional[str] = None, **kwargs) -> FakeRequest:
+        def run() -> dict:
+            video_ids = next((v for c, v in self.api.channel_uploads.items() if f"UU{c[2:]}" == playlistId), [])
+            start = int(pageToken or 0)
+            end = start + min(maxResults, 50)
+            response = {"items": [{"contentDetails": {"videoId": v}} for v in video_ids[start:end]]}
+            if end < len(video_ids):
+                response["nextPageToken"] = str(end)
+            return response
+        return FakeRequest(self.api, "playlistItems.list", run)
+
+
+def _comment_resource(comment: Dict[str, str], parent_id: Optional[str] = None) -> dict:
+    snippet = {
+        "authorDisplayName": comment["author"],
+        "textOriginal": comment["text"],
+        "publishedAt": comment.get("published_at", ""),
+    }
+    if parent_id is not None:
+        snippet["parentId"] = parent_id
+    return {"id": comment["id"], "snippet": snippet}
+
+
+def _thread_resource(comment: Dict[str, str], with_replies: bool = False) -> dict:
+    replies = comment.get("replies", [])
+    resource = {
+        "id": comment["id"],
+        "snippet": {
+            "topLevelComment": _comment_resource(comment),
+            "totalReplyCount": len(replies),
+        },
+    }
+    if with_replies and replies:
+        # Like the real API, only the first few replies come inline.
+        resource["replies"] = {"comments": [_comment_resource(r, comment["id"]) for r in replies[:5]]}
+    return resource
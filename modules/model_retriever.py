@@ -4,14 +4,20 @@ from pathlib import Path
 ROOT_DIR = Path(__file__).parent.parent
 sys.path.append(str(ROOT_DIR))
 
+import argparse
 import mlflow
 from mlflow.tracking import MlflowClient
 from mlflow.sklearn import load_model
 from joblib import dump
 from config.config import Config
+from modules.fake_youtube import synthetic_comments
+from utils.comment_normalizer import normalize_comments
+from utils.compact_model import CompactTextClassifier, save_compact_model, verify_compact_model
+from utils.prediction_cache import model_fingerprint
 
 
 MODEL_PATH = r'../assets/model.pkl'     # Access locally.
+COMPACT_MODEL_PATH = r'../assets/model.npz'
 
 
 class ModelRetriever:
@@ -41,14 +47,40 @@ class ModelRetriever:
         return model
 
         
-    def export_model(self, model):
+    def export_model(self, model, compact=False, holdout_texts=None):
         dump(model, MODEL_PATH)
+        
+        if compact:
+            self.export_compact_model(model, holdout_texts)
+
+
+    def export_compact_model(self, model, holdout_texts=None):
+        save_compact_model(model, COMPACT_MODEL_PATH, model_fingerprint(MODEL_PATH))
+        compact_model = CompactTextClassifier.load(COMPACT_MODEL_PATH)
+        
+        if holdout_texts is None:
+            holdout_texts = normalize_comments([c["text"] for c in synthetic_comments(10_000)])
+        
+        error = verify_compact_model(model, compact_model, holdout_texts)
+        if error is not None:
+            Path(COMPACT_MODEL_PATH).unlink()
+            raise ValueError(f"Compact model does not match the pipeline: {error}")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--compact", action="store_true", help="Also export the sklearn-free model.npz.")
+    parser.add_argument("--holdout", help="Text file with one comment per line to verify the compact model on.")
+    args = parser.parse_args()
+    
+    holdout_texts = None
+    if args.holdout:
+        with open(args.holdout, "r", encoding="utf-8") as f:
+            holdout_texts = normalize_comments(f.read().splitlines())
+    
     model_retriever = ModelRetriever()
     model_name, model_metrics = model_retriever.get_model_info()
     model = model_retriever.retrieve_model(model_name)
-    model_retriever.export_model(model)
+    model_retriever.export_model(model, compact=args.compact, holdout_texts=holdout_texts)
     
     print(f"Saved model with name: {model_name} \nand metrics: {model_metrics}")
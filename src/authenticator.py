@@ -1,11 +1,16 @@
+import json
 import threading
+import time
 from typing import Optional
 from pathlib import Path
+from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import Resource, build
 from tkinter import messagebox, StringVar, Tk, LabelFrame, Entry, Button, filedialog
 from config.config import Config
 from utils.logger import logger
+from utils.quota_scheduler import get_quota_scheduler
+from utils.token_store import load_credentials, refresh_credentials, save_credentials
+from utils.youtube_client import YouTubeClientPool
 
 
 class AuthSection:
@@ -13,7 +18,8 @@ class AuthSection:
         self.root = root
         self.credential_file_path = StringVar()
         
-        self.youtube = None
+        self.credentials = None
+        self.client_pool = None
 
 
     def render(self) -> None:
@@ -29,6 +35,8 @@ class AuthSection:
         Button(main_frame, text="Browse", command=self.browse_credential, width=8).grid(row=0, column=1, padx=5, pady=(0,5))
         Button(main_frame, text="Auth", command=self.start_auth, width=8).grid(row=0, column=2, padx=5, pady=(0,5))
 
+        threading.Thread(target=self._silent_auth_service, daemon=True).start()
+
 
     def browse_credential(self) -> None:
         file_path = filedialog.askopenfilename(filetypes=[("JSON", "*.json")])
@@ -50,21 +58,64 @@ class AuthSection:
         ).start()
 
 
+    def _silent_auth_service(self) -> None:
+        try:
+            started_at = time.perf_counter()
+            credentials = load_credentials(Config.TOKEN_PATH, Config.SCOPES)
+            if credentials is None or not refresh_credentials(credentials):
+                return
+            
+            self._set_credentials(credentials)
+            elapsed = time.perf_counter() - started_at
+            self.root.after(0, lambda: self._on_silent_auth_success(elapsed))
+
+        except Exception as e:
+            logger(f"Saved credentials could not be used: {e}", "WARNING")
+
+
     def _auth_service(self, credential_file_path) -> None:
         try:
-            flow = InstalledAppFlow.from_client_secrets_file(credential_file_path, Config.SCOPES)
-            credentials = flow.run_local_server(port=0)
-            self.youtube = build("youtube", "v3", credentials=credentials)
+            started_at = time.perf_counter()
+            credentials = load_credentials(Config.TOKEN_PATH, Config.SCOPES, client_id=self._client_id(credential_file_path))
+            
+            if credentials is None or not refresh_credentials(credentials):
+                flow = InstalledAppFlow.from_client_secrets_file(credential_file_path, Config.SCOPES)
+                credentials = flow.run_local_server(port=0)
+            
+            self._set_credentials(credentials)
             
             file_name = Path(credential_file_path).name
-            self.root.after(0, lambda: self._on_auth_success(file_name))
+            elapsed = time.perf_counter() - started_at
+            self.root.after(0, lambda: self._on_auth_success(file_name, elapsed))
 
         except Exception as e:
             self.root.after(0, lambda err=e: self._on_auth_error(err))
+
+
+    def _set_credentials(self, credentials: Credentials) -> None:
+        save_credentials(credentials, Config.TOKEN_PATH)        # Keep the refreshed token.
+        self.client_pool = YouTubeClientPool.for_credentials(
+            credentials, 
+            Config.CLIENT_POOL_SIZE, 
+            Config.HTTP_TIMEOUT, 
+            get_quota_scheduler()
+        )
+        self.credentials = credentials
+
+
+    def _client_id(self, credential_file_path: str) -> Optional[str]:
+        with open(credential_file_path, "r", encoding="utf-8") as f:
+            client_config = json.load(f)
+        client = client_config.get("installed") or client_config.get("web") or {}
+        return client.get("client_id")
         
     
-    def _on_auth_success(self, file_name: str) -> None:
-        logger(f"Authentication complete with: {file_name}", "INFO")
+    def _on_silent_auth_success(self, elapsed: float) -> None:
+        self.credential_file_path.set("*saved credentials")
+        logger(f"Authenticated with saved credentials in {elapsed * 1000:.0f} ms", "INFO")
+
+    def _on_auth_success(self, file_name: str, elapsed: float) -> None:
+        logger(f"Authentication complete with: {file_name} in {elapsed:.2f}s", "INFO")
         messagebox.showinfo("Success", "Authentication complete.")    
     
     def _on_auth_error(self, err: Exception) -> None:
@@ -72,5 +123,9 @@ class AuthSection:
         messagebox.showerror("Error", f"Authentication error: {err}")
 
 
-    def get_youtube(self) -> Optional[Resource]:
-        return self.youtube
+    def get_client_pool(self) -> Optional[YouTubeClientPool]:
+        return self.client_pool
+
+
+    def get_credentials(self) -> Optional[Credentials]:
+        return self.credentials
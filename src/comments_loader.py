@@ -1,21 +1,32 @@
 import threading
 import re
 from typing import Callable, List, Dict, Optional
-from tkinter import Tk, LabelFrame, Frame, Entry, Button, Scrollbar, StringVar, messagebox, Menu
-from tkinter import ttk
-from googleapiclient.discovery import Resource
+from tkinter import Tk, LabelFrame, Entry, Button, Label, StringVar, messagebox, Menu
 from googleapiclient.errors import HttpError
 from config.config import Config
+from core.service import CommentsService, LoadReport
+from utils.channel_sweep import SweepReport, VideoSweepResult
+from utils.comment_table import CommentTable
+from utils.youtube_client import YouTubeClientPool
 from utils.logger import logger
+from utils.metrics import timed
+from src.virtual_tree import VirtualTreeview
 
 
 class CommentsLoaderSection:
-    def __init__(self, root: Tk, youtube_getter: Callable[[], Optional[Resource]]) -> None:
+    def __init__(self, 
+                 root: Tk, 
+                 client_pool_getter: Callable[[], Optional[YouTubeClientPool]],
+                 service: CommentsService) -> None:
         self.root = root
-        self.youtube_getter = youtube_getter
+        self.client_pool_getter = client_pool_getter
+        self.service = service
         self.video_url = StringVar()
+        self.progress_text = StringVar()
 
         self.comments = None
+        self.loading = False
+        self.insert_at = 0
 
     
     def render(self) -> None:
@@ -29,75 +40,68 @@ class CommentsLoaderSection:
         entry.insert(0, "*www.youtube.com")
 
         Button(main_frame, text="Load", command=self.start_load, width=8).grid(row=0, column=1, padx=5, pady=(0,5))
+        Button(main_frame, text="Cancel", command=self.cancel_load, width=8).grid(row=0, column=2, padx=5, pady=(0,5))
 
-        child_frame = Frame(main_frame)
-        child_frame.grid(row=1, column=0, columnspan=2, padx=5, pady=(0,5), sticky="nsew")
-        child_frame.grid_columnconfigure(0, weight=1)
-        child_frame.grid_rowconfigure(0, weight=1)
-
-        self.tree = ttk.Treeview(child_frame, columns=("id", "author", "text"), show="headings")
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        self.tree.heading("id", text="Id")
-        self.tree.heading("author", text="Author")
-        self.tree.heading("text", text="Text")
-        self.tree.column("id", width=80)
-        self.tree.column("author", width=80)
-        self.tree.column("text", width=150)
-
-        scrollbar = Scrollbar(child_frame, orient="vertical", command=self.tree.yview)
-        scrollbar.grid(row=0, column=1, sticky="ns") 
-        self.tree.config(yscrollcommand=scrollbar.set)
+        self.tree = VirtualTreeview(
+            main_frame,
+            columns=(("id", "Id", 80), ("author", "Author", 80), ("text", "Text", 150)),
+            row_values=lambda c: (c["id"], c["author"], c["text"]),
+            row_key=lambda c: c["id"],
+            margin=Config.TREE_ROW_MARGIN
+        )
+        self.tree.grid(row=1, column=0, columnspan=3, padx=5, pady=(0,5), sticky="nsew")
 
         self.copy_popup = Menu(self.root, tearoff=0)
         self.copy_popup.add_command(label="Copy", command=self.copy_value)
-        self.tree.bind("<Button-3>", self.on_right_click)
+        self.tree.bind_row("<Button-3>", self.on_right_click)
+
+        Label(main_frame, textvariable=self.progress_text, font=("Arial", 8), fg="gray").grid(row=2, column=0, columnspan=3, padx=5, sticky="w")
 
 
     def start_load(self) -> None:
-        youtube = self.youtube_getter()
-        if youtube is None:
+        client_pool = self.client_pool_getter()
+        if client_pool is None:
             messagebox.showerror("Error", "Authenticate first!")
             return
         
+        channel_match = re.search(Config.CHANNEL_PATTERN, self.video_url.get())
         match = re.search(Config.VIDEO_ID_PATTERN, self.video_url.get())
-        if not match:
+        if not channel_match and not match:
             messagebox.showerror("Error", "Enter a valid YouTube URL!")
             return
-        video_id = match.group(1)
-        
+
+        if self.loading:
+            messagebox.showerror("Error", "Loading is still in progress!")
+            return
+
+        self.loading = True
+        self.comments = CommentTable()
+        self.insert_at = 0
+        self.tree.show(self.comments)
+
+        if channel_match:
+            threading.Thread(
+                target=self._sweep_service, 
+                kwargs={"client_pool": client_pool, "channel": channel_match.group(1) or channel_match.group(2)}, 
+                daemon=True
+            ).start()
+            return
+
         threading.Thread(
             target=self._load_service, 
-            kwargs={"youtube": youtube, "video_id": video_id}, 
+            kwargs={"client_pool": client_pool, "video_id": match.group(1)}, 
             daemon=True
         ).start()
 
 
-    def _load_service(self, youtube: Resource, video_id: str) -> None:
+    def cancel_load(self) -> None:
+        self.service.cancel()
+
+
+    def _load_service(self, client_pool: YouTubeClientPool, video_id: str) -> None:
         try:
-            comments = []
-            next_page = None
-            
-            while True:
-                response = youtube.commentThreads().list(
-                    part="snippet",
-                    videoId=video_id,
-                    maxResults=100,
-                    pageToken=next_page
-                ).execute()
-
-                for item in response.get("items", []):
-                    snippet = item["snippet"]["topLevelComment"]["snippet"]
-                    comments.append({
-                        "id": item["id"],
-                        "author": snippet["authorDisplayName"],
-                        "text": snippet["textOriginal"]
-                    })
-
-                next_page = response.get("nextPageToken")
-                if not next_page:
-                    break
-              
-            self.root.after(0, lambda: self._on_load_success(comments))
+            report = self.service.load_video(client_pool, video_id, on_page=self._post_page)
+            self.root.after(0, lambda: self._on_load_success(report))
 
         except HttpError as e:
             self.root.after(0, lambda err=e: self._on_http_error(err))
@@ -106,46 +110,94 @@ class CommentsLoaderSection:
             self.root.after(0, lambda err=e: self._on_load_error(err))
 
 
-    def _on_load_success(self, comments: List[Dict[str, str]]) -> None:
-        if comments:
-            self.comments = comments        # Update global scope for getter.
-            self.render_comments(comments)
+    def _sweep_service(self, client_pool: YouTubeClientPool, channel: str) -> None:
+        def on_video(result: VideoSweepResult, done: int, total: int) -> None:
+            progress = f"Videos: {done}/{total} | Comments: {len(self.comments)}"
+            self.root.after(0, lambda text=progress: self.progress_text.set(text))
+
+        try:
+            report, cancelled = self.service.sweep_channel(client_pool, channel, on_page=self._post_page, on_video=on_video)
+            self.root.after(0, lambda: self._on_sweep_success(report, cancelled))
+
+        except HttpError as e:
+            self.root.after(0, lambda err=e: self._on_http_error(err))
             
-            logger(f"Loaded {len(comments)} comment(s).", 'INFO')
-            messagebox.showinfo("Success", f"Loaded {len(comments)} comment(s).")
+        except Exception as e:
+            self.root.after(0, lambda err=e: self._on_load_error(err))
+
+
+    def _post_page(self, newer: List[Dict[str, str]], older: List[Dict[str, str]], progress: Optional[str]) -> None:
+        self.root.after(0, lambda: self._on_page_loaded(newer, older, progress))
+
+
+    def _on_page_loaded(self, newer: List[Dict[str, str]], older: List[Dict[str, str]], progress: Optional[str]) -> None:
+        # Comments newer than the stored ones go above them, in the order they arrive.
+        # The tree shows self.comments itself, so each page is stored once, as columns.
+        with timed("tree_render_seconds"):
+            if newer:
+                self.comments.insert(self.insert_at, newer)
+                self.insert_at += len(newer)
+            if older:
+                self.comments.extend(older)
+            self.tree.refresh()
+        if progress is not None:
+            self.progress_text.set(progress)
+
+
+    def _on_load_success(self, report: LoadReport) -> None:
+        self.loading = False
+        progress = report.progress
+        self.progress_text.set(f"{self.service.describe_progress(progress)} | {progress.elapsed:.1f}s")
+        for parent_id, error in report.reply_errors:
+            logger(f"Replies of {parent_id} skipped: {error}", 'WARNING')
+
+        if report.quota_paused:
+            messagebox.showwarning("Warning", f"Loading paused to keep quota for removal, kept {len(self.comments)} comment(s).")
+
+        elif report.cancelled:
+            logger(f"Loading cancelled, kept {len(self.comments)} comment(s).", 'WARNING')
+            messagebox.showinfo("Info", f"Loading cancelled, kept {len(self.comments)} comment(s).")
+
+        elif self.comments:
+            logger(f"Loaded {len(self.comments)} comment(s) in {progress.elapsed:.1f}s.", 'INFO')
+            messagebox.showinfo("Success", f"Loaded {len(self.comments)} comment(s).")
 
         else:
             messagebox.showinfo("Info", "No comment found.")
             return
 
+    def _on_sweep_success(self, report: SweepReport, cancelled: bool) -> None:
+        self.loading = False
+        self.progress_text.set(report.describe())
+
+        if cancelled:
+            messagebox.showinfo("Info", f"Sweep cancelled, kept {len(self.comments)} comment(s).")
+        elif self.comments:
+            messagebox.showinfo("Success", f"Loaded {len(self.comments)} comment(s) from {len(report.results)} video(s).")
+        else:
+            messagebox.showinfo("Info", "No comment found.")
+
     def _on_http_error(self, err: Exception) -> None:
+        self.loading = False
         logger(f"Failed to load comments: {err}", "ERROR")
         messagebox.showerror("Error", f"Failed to load comments: {err}")
         
     def _on_load_error(self, err: Exception) -> None:
+        self.loading = False
         logger(f"An unexpected error occurred: {err}", "ERROR")
         messagebox.showerror("Error", f"An unexpected error occurred: {err}")
 
 
-    def render_comments(self, comments: List[Dict[str, str]]) -> None:
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-
-        for comment in comments:
-            self.tree.insert("", "end", values=(comment["id"], comment["author"], comment["text"]))
-           
- 
     def on_right_click(self, event):
-        row_id = self.tree.identify_row(event.y)
-        if not row_id:
+        index = self.tree.identify_row(event.y)
+        if index is None:
             return
         
-        col = self.tree.identify_column(event.x)
+        col_index = self.tree.identify_column(event.x)
 
-        self.tree.selection_set(row_id)
-        col_index = int(col.replace("#", "")) - 1
+        self.tree.select_index(index)
 
-        values = self.tree.item(row_id, "values")
+        values = self.tree.row_values(self.tree.item_at(index))
         self.selected_cell_value = values[col_index]
 
         self.copy_popup.tk_popup(event.x_root, event.y_root)
@@ -157,5 +209,5 @@ class CommentsLoaderSection:
         self.root.update()
 
     
-    def get_comments(self) -> Optional[List[Dict[str, str]]]:
+    def get_comments(self) -> Optional[CommentTable]:
         return self.comments
@@ -2,32 +2,44 @@ import threading
 import re
 from typing import Callable, List, Dict, Optional
 from tkinter import Tk, Toplevel, StringVar, BooleanVar
-from tkinter import Frame, LabelFrame, Entry, Button, Checkbutton, Menu, Scrollbar
+from tkinter import Frame, LabelFrame, Entry, Button, Checkbutton, Label, Menu
 from tkinter import messagebox
-from tkinter import ttk
-from googleapiclient.discovery import Resource
 from googleapiclient.errors import HttpError
-from sklearn.base import BaseEstimator
 from config.config import Config
-from utils.comment_normalizer import normalize_comment
+from core.service import CommentsService
+from utils.flagged_store import FlaggedStore
 from utils.logger import logger
+from utils.metrics import timed
+from utils.moderation_engine import ModerationReport
+from utils.moderation_journal import ModerationJob
+from utils.near_duplicates import group_clusters
+from utils.spam_tiers import TIER_REVIEW
+from utils.youtube_client import YouTubeClientPool
+from src.virtual_tree import VirtualTreeview
 
 
 class CommentsRemoverSection:
     def __init__(self, 
                  root: Tk, 
-                 model: Optional[BaseEstimator], 
-                 youtube_getter: Callable[[], Optional[Resource]],
-                 comments_getter: Callable[[], Optional[List[Dict[str, str]]]]) -> None:
+                 client_pool_getter: Callable[[], Optional[YouTubeClientPool]],
+                 comments_getter: Callable[[], Optional[List[Dict[str, str]]]],
+                 service: CommentsService) -> None:
         self.root = root
-        self.model = model
-        self.youtube_getter = youtube_getter
+        self.client_pool_getter = client_pool_getter
         self.comments_getter = comments_getter
+        self.service = service
+        self.model_handle = service.model_handle
         self.target_comment_id = StringVar()                    
         self.enable_ban_author = BooleanVar(value=False)
         self.enable_ai_assisted = BooleanVar(value=False)
+        self.group_duplicates = BooleanVar(value=True)
+        self.model_status = StringVar(value="Loading model...")
+        self.quota_text = StringVar()
+        self.cancel_text = StringVar()
 
         self.flagged_comments = None
+        self.flagged_groups = {}
+        self.group_keys = {}        # Comment id -> key of the row holding it.
 
 
     def render(self) -> None:
@@ -47,11 +59,15 @@ class CommentsRemoverSection:
         
         Checkbutton(child_frame, text="Ban author", variable=self.enable_ban_author).grid(row=0, column=0, sticky='nw')
         Checkbutton(child_frame, text="AI assisted (remove online gambling)", variable=self.enable_ai_assisted, command=self.disable_comments_entry).grid(row=1, column=0, sticky='nw')        
+        Label(child_frame, textvariable=self.model_status, font=("Arial", 8), fg="gray").grid(row=2, column=0, padx=5, sticky='nw')
+
+        self.model_handle.add_done_callback(lambda _: self.root.after(0, self._on_model_loaded))
+        self.root.after(0, self.check_pending_jobs)
 
     
     def start_remove(self) -> None:
-        youtube = self.youtube_getter()
-        if youtube is None:
+        client_pool = self.client_pool_getter()
+        if client_pool is None:
             messagebox.showerror("Error", "Authenticate first!")
             return
         
@@ -64,29 +80,29 @@ class CommentsRemoverSection:
             
             threading.Thread(
                 target=self._manual_remove_service, 
-                kwargs={"youtube": youtube, "comment_id": comment_id},
+                kwargs={"client_pool": client_pool, "comment_id": comment_id},
                 daemon=True
             ).start()
 
         else:
             comments = self.comments_getter()
-            if comments is None or self.model is None:
+            if comments is None:
+                return
+
+            if self.model_handle.done() and self.model_handle.result() is None:
+                messagebox.showerror("Error", "Model failed to load.")
                 return
 
             threading.Thread(
                 target=self._ai_assisted_remove_service, 
-                kwargs={"youtube": youtube, "model": self.model, "comments": comments},
+                kwargs={"client_pool": client_pool, "comments": comments},
                 daemon=True
             ).start()
 
 
-    def _manual_remove_service(self, youtube: Resource, comment_id: str) -> None:   
+    def _manual_remove_service(self, client_pool: YouTubeClientPool, comment_id: str) -> None:   
         try:
-            youtube.comments().setModerationStatus(
-                id=comment_id,
-                moderationStatus="rejected",
-                banAuthor=self.enable_ban_author.get()
-            ).execute()
+            self.service.remove_one(client_pool, comment_id, ban_author=self.enable_ban_author.get())
             
             self.root.after(0, lambda: self._on_manual_remove_success(comment_id))
             
@@ -97,28 +113,28 @@ class CommentsRemoverSection:
             self.root.after(0, lambda err=e: self._on_remove_error(err))
             
     
-    def _ai_assisted_remove_service(self, youtube: Resource, model: BaseEstimator, comments: Optional[List[Dict[str, str]]]) -> None:
+    def _ai_assisted_remove_service(self, client_pool: YouTubeClientPool, comments: Optional[List[Dict[str, str]]]) -> None:
+        model = self.model_handle.result()       # Waits only if the model is still loading.
         comments = self.comments_getter()
-        if comments is None or self.model is None:
+        if comments is None or model is None:
             return
 
         try:
-            texts = [normalize_comment(c["text"]) for c in comments]
-            predictions = model.predict(texts)
-            flagged_comments = [comments[i] for i, p in enumerate(predictions) if p == 1]
+            flagged_comments = self.service.flag(comments)
 
         except Exception as e:
             self.root.after(0, lambda err=e: self._on_ai_prediction_error(err))
+            return
 
         if not flagged_comments:
             self.root.after(0, lambda: messagebox.showinfo("Info", "No flagged comment to remove."))
             return
         
-        self.flagged_comments = flagged_comments        # Send to global scope.
-        self.root.after(0, lambda: self.remove_confirmation(youtube))
+        self.flagged_comments = FlaggedStore(flagged_comments)        # Send to global scope.
+        self.root.after(0, lambda: self.remove_confirmation(client_pool))
     
 
-    def remove_confirmation(self, youtube: Resource) -> None:
+    def remove_confirmation(self, client_pool: YouTubeClientPool) -> None:
         self.confirmation_root = Toplevel(self.root)
         self.confirmation_root.geometry(f"{Config.REMOVE_CONFIRMATION_WINDOW_WIDTH}x{Config.REMOVE_CONFIRMATION_WINDOW_HEIGHT}")
         self.confirmation_root.title(Config.REMOVE_CONFIRMATION_WINDOW_TITLE)
@@ -133,18 +149,24 @@ class CommentsRemoverSection:
         main_frame.grid_columnconfigure(0, weight=1)
         main_frame.grid_rowconfigure(0, weight=1) 
 
-        self.tree = ttk.Treeview(main_frame, columns=("id", "author", "text"), show="headings")
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        self.tree.heading("id", text="ID")
-        self.tree.heading("author", text="Author")
-        self.tree.heading("text", text="Text")
-        self.tree.column("id", width=150)
-        self.tree.column("author", width=150)
-        self.tree.column("text", width=300)
-
-        y_scroll = Scrollbar(main_frame, orient="vertical", command=self.tree.yview)
-        y_scroll.grid(row=0, column=1, sticky="ns")
-        self.tree.config(yscrollcommand=y_scroll.set)
+        # Rows are groups of near-duplicate comments; ungrouped, every group holds one comment.
+        # Items are group keys, which stay the same while comments are cancelled out of a group.
+        if any("video_id" in c for c in self.flagged_comments):
+            columns = (("count", "#", 40), ("tier", "Tier", 90), ("video", "Video", 90), ("id", "ID", 110), ("author", "Author", 100), ("text", "Text", 150))
+            row_values = lambda g: (self._group_count(g), self._group_tier(g), self._group_field(g, "video_id", "videos"), g[0]["id"], self._group_field(g, "author", "authors"), g[0]["text"])
+        else:
+            columns = (("count", "#", 40), ("tier", "Tier", 90), ("id", "ID", 120), ("author", "Author", 120), ("text", "Text", 230))
+            row_values = lambda g: (self._group_count(g), self._group_tier(g), g[0]["id"], self._group_field(g, "author", "authors"), g[0]["text"])
+
+        self.tree = VirtualTreeview(
+            main_frame,
+            columns=columns,
+            row_values=lambda key: row_values(self.flagged_groups[key]),
+            row_key=lambda key: key,
+            margin=Config.TREE_ROW_MARGIN,
+            selectmode="extended"
+        )
+        self.tree.grid(row=0, column=0, columnspan=2, sticky="nsew")
         
         confirm_frame = Frame(main_frame)
         confirm_frame.grid(row=1, column=0, columnspan=2, padx=5, pady=5, sticky="ew") 
@@ -152,7 +174,12 @@ class CommentsRemoverSection:
         confirm_frame.grid_columnconfigure(0, weight=1)
         # confirm_frame.grid_rowconfigure(0, weight=1)
         
-        Button(confirm_frame, text="Confirm", command=lambda: self.on_confirm(youtube), width=8).grid(row=0, column=1, pady=5, padx=5)
+        Label(confirm_frame, textvariable=self.quota_text, font=("Arial", 8), fg="gray").grid(row=0, column=0, padx=5, sticky="w")
+        Checkbutton(confirm_frame, text="Group near-duplicates", variable=self.group_duplicates, command=self.set_flagged_rows).grid(row=0, column=1, padx=5)
+        Button(confirm_frame, text="Confirm", command=lambda: self.on_confirm(client_pool), width=8).grid(row=0, column=2, pady=5, padx=5)
+
+        Entry(confirm_frame, textvariable=self.cancel_text).grid(row=1, column=0, columnspan=2, padx=5, sticky="ew")
+        Button(confirm_frame, text="Cancel matching", command=self.cancel_matching).grid(row=1, column=2, padx=5)
 
         self.render_flagged_comments()
 
@@ -161,44 +188,92 @@ class CommentsRemoverSection:
 
     def on_close_confirmation(self) -> None:
         self.flagged_comments = None
+        self.flagged_groups = {}
+        self.group_keys = {}
+        self.cancel_text.set("")
         self.confirmation_root.destroy()
         
     
-    def on_confirm(self, youtube: Resource) -> None:
+    def on_confirm(self, client_pool: YouTubeClientPool) -> None:
         threading.Thread(
             target=self._ai_assisted_remove_service_2, 
-            kwargs={"youtube": youtube},
+            kwargs={"client_pool": client_pool, "ban_author": self.enable_ban_author.get()},
             daemon=True
         ).start()
     
-    def _ai_assisted_remove_service_2(self, youtube: Resource) -> None:
+    def _ai_assisted_remove_service_2(self, client_pool: YouTubeClientPool, ban_author: bool) -> None:
         try:
-            for comment in self.flagged_comments:       # Get updated flagged_comments.
-                youtube.comments().setModerationStatus(
-                    id=comment['id'],
-                    moderationStatus="rejected",
-                    banAuthor=self.enable_ban_author.get()
-                ).execute()
+            comment_ids = self.flagged_comments.ids()       # Get updated flagged_comments.
+            report = self.service.remove(client_pool, comment_ids, ban_author=ban_author)
             
-            len_flagged_comments = len(self.flagged_comments)
-            self.root.after(0, lambda: self._on_ai_assisted_remove_success(len_flagged_comments))
-            
-        except HttpError as e:
-            self.root.after(0, lambda err=e: self._on_http_error(err))
+            self.root.after(0, lambda: self._on_ai_assisted_remove_success(report))
             
         except Exception as e:
             self.root.after(0, lambda err=e: self._on_remove_error(err))
 
-        self.on_close_confirmation()
+        self.root.after(0, self.on_close_confirmation)
+
+
+    def check_pending_jobs(self) -> None:
+        # Removals interrupted by a crash or a lost connection, offered once saved credentials are usable.
+        jobs = self.service.pending_jobs()
+        if not jobs:
+            return
+        client_pool = self.client_pool_getter()
+        if client_pool is None:
+            self.root.after(Config.RESUME_CHECK_INTERVAL_MS, self.check_pending_jobs)
+            return
+
+        remaining = sum(len(job.remaining) for job in jobs)
+        answer = messagebox.askyesnocancel(
+            "Resume",
+            f"{len(jobs)} removal job(s) did not finish, {remaining} comment(s) left. Resume now?\n\n"
+            "No discards them, Cancel asks again on the next start."
+        )
+        if answer is None:
+            return
+        if not answer:
+            for job in jobs:
+                self.service.discard_job(job)
+            return
+
+        threading.Thread(
+            target=self._resume_service,
+            kwargs={"client_pool": client_pool, "jobs": jobs},
+            daemon=True
+        ).start()
+
+    def _resume_service(self, client_pool: YouTubeClientPool, jobs: List[ModerationJob]) -> None:
+        try:
+            report = ModerationReport()
+            for job in jobs:
+                job_report = self.service.resume(client_pool, job)
+                report.results.extend(job_report.results)
+                report.elapsed += job_report.elapsed
+
+            self.root.after(0, lambda: self._on_ai_assisted_remove_success(report))
+
+        except Exception as e:
+            self.root.after(0, lambda err=e: self._on_remove_error(err))
+
 
+    def _on_model_loaded(self) -> None:
+        if self.model_handle.result() is None:
+            self.model_status.set("Model failed to load.")
+            messagebox.showerror("Error", "Model failed to load.")
+        else:
+            self.model_status.set("Model ready.")
 
     def _on_manual_remove_success(self, comment_id: str) -> None:
-        logger(f"Removed comment with id: {comment_id}", 'INFO')
         messagebox.showinfo("Success", f"Removed comment with id: {comment_id}")
 
-    def _on_ai_assisted_remove_success(self, len_flagged_comments: int) -> None:
-        logger(f"Removed {len_flagged_comments} comments", 'INFO')
-        messagebox.showinfo("Success", f"Removed {len_flagged_comments} comments")
+    def _on_ai_assisted_remove_success(self, report: ModerationReport) -> None:
+        removed = len(report.succeeded)
+        if not report.failed:
+            messagebox.showinfo("Success", f"Removed {removed} comments")
+            return
+        
+        messagebox.showwarning("Warning", f"Removed {removed} comments, {len(report.failed)} failed. See log for details.")
         
     def _on_ai_prediction_error(self, err: Exception) -> None:
         logger(f"AI Prediction failed: {err}", 'ERROR')
@@ -214,26 +289,96 @@ class CommentsRemoverSection:
         
 
     def render_flagged_comments(self) -> None:
-        for flagged_comment in self.flagged_comments:
-            self.tree.insert("", "end", iid=flagged_comment["id"], values=(flagged_comment["id"], flagged_comment["author"], flagged_comment["text"]))
+        self.set_flagged_rows()
 
         self.cancel_popup = Menu(self.confirmation_root, tearoff=0)
-        self.cancel_popup.add_command(label="Cancel", command=lambda: self.cancel_item())
-        self.tree.bind("<Button-3>", lambda e: self.on_right_click(e))
+        self.cancel_popup.add_command(label="Cancel", command=lambda: self.cancel_selected())
+        self.cancel_popup.add_command(label="Cancel all by author", command=lambda: self.cancel_by_author())
+        self.tree.bind_row("<Button-3>", lambda e: self.on_right_click(e))
+        self.tree.bind_row("<Delete>", lambda e: self.cancel_selected())
 
 
-    def cancel_item(self) -> None:
-        selected = self.tree.selection()
-        if selected:
-            cid_to_remove = selected[0]
-            self.tree.delete(cid_to_remove)
-            self.flagged_comments[:] = [c for c in self.flagged_comments if c["id"] != cid_to_remove]
+    def set_flagged_rows(self) -> None:
+        if self.group_duplicates.get():
+            groups = group_clusters(self.flagged_comments)
+        else:
+            groups = [[c] for c in self.flagged_comments]
+        groups.sort(key=lambda g: not any(c.get("tier") == TIER_REVIEW for c in g))        # Uncertain ones first.
+        self.flagged_groups = {g[0]["id"]: g for g in groups}
+        self.group_keys = {c["id"]: key for key, group in self.flagged_groups.items() for c in group}
+
+        with timed("confirmation_render_seconds"):
+            self.tree.set_items(self.flagged_groups)
+        self.update_quota_estimate()
+
+
+    def cancel_selected(self) -> None:
+        # Cancelling a group row keeps the whole near-duplicate group.
+        self.cancel_comments([c["id"] for key in self.tree.selection() for c in self.flagged_groups[key]])
+
+    def cancel_by_author(self) -> None:
+        authors = {c.get("author", "") for key in self.tree.selection() for c in self.flagged_groups[key]}
+        self.cancel_comments(self.flagged_comments.ids_by_author(authors))
+
+    def cancel_matching(self) -> None:
+        comment_ids = self.flagged_comments.ids_matching(self.cancel_text.get())
+        if not comment_ids:
+            messagebox.showinfo("Info", "No flagged comment matches that text.", parent=self.confirmation_root)
+            return
+        self.cancel_comments(comment_ids)
+
+
+    def cancel_comments(self, comment_ids: List[str]) -> None:
+        # One bulk removal: the store drops the ids, only the groups they belong to are filtered,
+        # and the tree drops emptied rows and redraws the visible ones once.
+        removed = {c["id"] for c in self.flagged_comments.remove(comment_ids)}
+        if not removed:
+            return
+
+        emptied = []
+        for key in {self.group_keys.pop(i) for i in removed}:
+            group = self.flagged_groups[key]
+            group[:] = [c for c in group if c["id"] not in removed]
+            if not group:
+                del self.flagged_groups[key]
+                emptied.append(key)
+
+        with timed("confirmation_render_seconds"):
+            self.tree.remove_keys(emptied)
+        self.update_quota_estimate()
+
+
+    def _group_count(self, group: List[Dict[str, str]]) -> str:
+        return str(len(group)) if len(group) > 1 else ""
+
+    def _group_tier(self, group: List[Dict[str, str]]) -> str:
+        tiers = {c.get("tier", "") for c in group}
+        if len(tiers) > 1:
+            return "mixed"
+        comment = group[0]
+        return f"{comment.get('tier', '')} {'keyword' if 'keyword' in comment else format(comment.get('score', 0.0), '.2f')}"
+
+    def _group_field(self, group: List[Dict[str, str]], key: str, plural: str) -> str:
+        values = {c.get(key, "") for c in group}
+        return group[0].get(key, "") if len(values) == 1 else f"{len(values)} {plural}"
+
+
+    def update_quota_estimate(self) -> None:
+        client_pool = self.client_pool_getter()
+        estimate = self.service.estimate_removal(client_pool, len(self.flagged_comments)) if client_pool is not None else None
+        if estimate is None:
+            self.quota_text.set("")
+        elif estimate.fits:
+            self.quota_text.set(estimate.describe())
+        else:
+            self.quota_text.set(f"{estimate.describe()} Only part will be removed.")
 
 
     def on_right_click(self, event) -> None:
-        row_id = self.tree.identify_row(event.y)
-        if row_id:
-            self.tree.selection_set(row_id)
+        index = self.tree.identify_row(event.y)
+        if index is not None:
+            if self.tree.item_at(index) not in self.tree.selected_keys:      # Keep a multi-row selection.
+                self.tree.select_index(index)
             self.cancel_popup.tk_popup(event.x_root, event.y_root)
 
 
@@ -1,19 +1,13 @@
-import subprocess
 from tkinter import Tk, Frame, Label
-
-
-def get_ping() -> str:
-    try:
-        output = subprocess.check_output("ping -n 1 console.cloud.google.com", shell=True).decode()
-        return output.split("time=")[1].split("ms")[0] + " ms"
-    except:
-        return "Disconnected"
+from config.config import Config
+from utils.latency_monitor import LatencyMonitor
 
 
 class FooterUI:
     def __init__(self, root: Tk) -> None:
         self.root = root
         self.ping_label = None
+        self.latency_monitor = LatencyMonitor(Config.PING_HOST, Config.PING_PORT, interval=Config.PING_INTERVAL)
 
 
     def render(self) -> None:
@@ -25,10 +19,14 @@ class FooterUI:
         self.ping_label = Label(frame, text="Checking...", font=("Arial", 8))
         self.ping_label.pack(side='right', padx=5)
 
+        self.latency_monitor.start()
         self.show_ping()
 
 
     def show_ping(self) -> None:
-        ms = get_ping()
-        self.ping_label.config(text=ms)
-        self.root.after(1000, self.show_ping)
+        snapshot = self.latency_monitor.snapshot()
+        if snapshot is not None:
+            text = snapshot.describe()
+            if text != self.ping_label.cget("text"):
+                self.ping_label.config(text=text)
+        self.root.after(int(Config.PING_INTERVAL * 1000), self.show_ping)
@@ -1,6 +1,8 @@
-from tkinter import Tk, Menu, Toplevel, Frame, Text, Scrollbar, messagebox
-from utils.assets_loader import load_logs
+from tkinter import Tk, Menu, Toplevel, Frame, Text, Scrollbar, Button, Checkbutton, BooleanVar, messagebox, filedialog
+from tkinter import ttk
 from config.config import Config
+from utils.logger import LogPager, flush_logs, logger
+from utils.metrics import metrics
 
 
 class MenuUI:
@@ -15,6 +17,7 @@ class MenuUI:
         filemenu = Menu(menu, tearoff=False)
         menu.add_cascade(label="File", menu=filemenu)
         filemenu.add_command(label="Log", command=self.show_logs)
+        filemenu.add_command(label="Performance", command=self.show_performance)
         filemenu.add_command(label="Exit", command=self.root.quit)
 
         helpmenu = Menu(menu, tearoff=False)
@@ -37,26 +40,126 @@ class MenuUI:
         
         main_frame.grid_columnconfigure(0, weight=1)
 
+        self.logs_pager = None
         self.logs_text = Text(main_frame, wrap="word", state="disabled")
         self.logs_text.grid(row=0, column=0, sticky="nsew")
 
-        y_scroll = Scrollbar(main_frame, orient="vertical", command=self.logs_text.yview)
-        y_scroll.grid(row=0, column=1, sticky="ns")
-        self.logs_text.config(yscrollcommand=y_scroll.set)
+        self.logs_scroll = Scrollbar(main_frame, orient="vertical", command=self.logs_text.yview)
+        self.logs_scroll.grid(row=0, column=1, sticky="ns")
+        self.logs_text.config(yscrollcommand=self._on_logs_scroll)
         
         self._load_logs()
     
     
     def _load_logs(self) -> None:
-        logs = load_logs()
+        flush_logs()
+        try:
+            self.logs_pager = LogPager(Config.LOGS_PATH, Config.LOG_PAGE_SIZE)
+        except Exception as e:
+            messagebox.showerror("Error", "Logs failed to load.")
+            return
         
         self.logs_text.config(state="normal")
         self.logs_text.delete("1.0", "end")
         
-        if logs is None:
-            self.logs_text.insert("1.0", "No log file found.")
+        if not self.logs_pager.has_more:
+            self.logs_text.insert("1.0", "No log found.")
 
         else:
-            self.logs_text.insert("1.0", logs)
+            self.logs_text.insert("1.0", "".join(self.logs_pager.previous_page()))
+            self.logs_text.see("end")
         
         self.logs_text.config(state="disabled")
+
+
+    def _load_older_logs(self) -> None:
+        lines = self.logs_pager.previous_page()
+        
+        self.logs_text.config(state="normal")
+        self.logs_text.insert("1.0", "".join(lines))
+        self.logs_text.config(state="disabled")
+        self.logs_text.yview(f"{len(lines) + 1}.0")        # Keep the current line in view.
+
+
+    def _on_logs_scroll(self, first: str, last: str) -> None:
+        self.logs_scroll.set(first, last)
+        if float(first) == 0.0 and self.logs_pager is not None and self.logs_pager.has_more:
+            self.root.after_idle(self._load_older_logs)
+
+
+    def show_performance(self) -> None:
+        self.performance_root = Toplevel(self.root)
+        self.performance_root.geometry(f"{Config.LOG_WINDOW_WIDTH}x{Config.LOG_WINDOW_HEIGHT}")
+        self.performance_root.title("Performance")
+
+        main_frame = Frame(self.performance_root)
+        main_frame.pack(fill="both", expand=True, padx=5, pady=5)
+
+        main_frame.grid_columnconfigure(0, weight=1)
+        main_frame.grid_rowconfigure(1, weight=1)
+
+        controls = Frame(main_frame)
+        controls.grid(row=0, column=0, columnspan=2, sticky="w", pady=(0, 5))
+
+        self.metrics_enabled = BooleanVar(value=metrics.enabled)
+        Checkbutton(controls, text="Enabled", variable=self.metrics_enabled, command=self._toggle_metrics).pack(side="left")
+        Button(controls, text="Reset", command=self._reset_metrics).pack(side="left", padx=(5, 0))
+        Button(controls, text="Export JSON", command=lambda: self._export_metrics("json")).pack(side="left", padx=(5, 0))
+        Button(controls, text="Export Prometheus", command=lambda: self._export_metrics("prometheus")).pack(side="left", padx=(5, 0))
+
+        columns = ("count", "total", "mean", "p95", "max")
+        self.metrics_tree = ttk.Treeview(main_frame, columns=columns, show="tree headings")
+        self.metrics_tree.heading("#0", text="Metric")
+        self.metrics_tree.column("#0", width=200)
+        for column in columns:
+            self.metrics_tree.heading(column, text=column.capitalize())
+            self.metrics_tree.column(column, width=70, anchor="e")
+        self.metrics_tree.grid(row=1, column=0, sticky="nsew")
+
+        scroll = Scrollbar(main_frame, orient="vertical", command=self.metrics_tree.yview)
+        scroll.grid(row=1, column=1, sticky="ns")
+        self.metrics_tree.config(yscrollcommand=scroll.set)
+
+        self._refresh_metrics()
+
+
+    def _refresh_metrics(self) -> None:
+        if not self.performance_root.winfo_exists():
+            return
+
+        self.metrics_tree.delete(*self.metrics_tree.get_children())
+        for name, count, total, mean, p95, maximum in metrics.rows():
+            if name.endswith("_seconds"):
+                values = (count, f"{total:.3f}s", f"{mean * 1000:.1f}ms", f"{p95 * 1000:.1f}ms", f"{maximum * 1000:.1f}ms")
+            else:
+                values = (count, "", "", "", "")
+            self.metrics_tree.insert("", "end", text=name, values=values)
+
+        self.performance_root.after(Config.METRICS_REFRESH_MS, self._refresh_metrics)
+
+
+    def _toggle_metrics(self) -> None:
+        metrics.enabled = self.metrics_enabled.get()
+
+
+    def _reset_metrics(self) -> None:
+        metrics.reset()
+        self.metrics_tree.delete(*self.metrics_tree.get_children())
+
+
+    def _export_metrics(self, fmt: str) -> None:
+        extension = ".json" if fmt == "json" else ".prom"
+        path = filedialog.asksaveasfilename(
+            parent=self.performance_root,
+            defaultextension=extension,
+            filetypes=[("JSON" if fmt == "json" else "Prometheus", f"*{extension}")]
+        )
+        if not path:
+            return
+
+        try:
+            metrics.export(path, fmt)
+            logger(f"Metrics exported to {path}.", 'INFO')
+        except Exception as e:
+            logger(f"Metrics failed to export: {e}", 'ERROR')
+            messagebox.showerror("Error", "Metrics failed to export.")
@@ -0,0 +1,165 @@
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Set, Tuple
+from tkinter import Frame, Scrollbar
+from tkinter import ttk
+
+
+class VirtualTreeview(Frame):
+    def __init__(self,
+                 master,
+                 columns: Sequence[Tuple[str, str, int]],
+                 row_values: Callable[[Any], Tuple],
+                 row_key: Callable[[Any], str],
+                 margin: int = 2,
+                 selectmode: str = "browse") -> None:
+        super().__init__(master)
+        self.row_values = row_values
+        self.row_key = row_key
+        self.margin = margin
+
+        self.items: List[Any] = []
+        self.offset = 0
+        self.visible_rows = 10
+        self.slots: List[str] = []
+        self.selected_keys: Set[str] = set()
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(self, columns=[c[0] for c in columns], show="headings", selectmode=selectmode)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        for name, heading, width in columns:
+            self.tree.heading(name, text=heading)
+            self.tree.column(name, width=width)
+
+        self.scrollbar = Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", lambda e: self._scroll_by(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(1, "units"))
+        self.tree.bind("<Prior>", lambda e: self._scroll_by(-1, "pages"))
+        self.tree.bind("<Next>", lambda e: self._scroll_by(1, "pages"))
+
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+    def bind_row(self, sequence: str, func: Callable) -> None:
+        self.tree.bind(sequence, func)
+
+
+    def set_items(self, items: Iterable[Any]) -> None:
+        self.items = list(items)
+        self.offset = 0
+        self.selected_keys.clear()
+        self.refresh()
+
+
+    def show(self, items: Sequence[Any]) -> None:
+        # Displays a sequence the caller keeps and grows, without copying it; call refresh() after changes.
+        self.items = items
+        self.offset = 0
+        self.selected_keys.clear()
+        self.refresh()
+
+
+    def remove_keys(self, keys: Iterable[str]) -> None:
+        keys = set(keys)
+        self.items = [item for item in self.items if self.row_key(item) not in keys]
+        self.selected_keys -= keys
+        self.refresh()
+
+
+    def identify_row(self, y: int) -> Optional[int]:
+        slot = self.tree.identify_row(y)
+        if not slot:
+            return None
+        return self.offset + self.slots.index(slot)
+
+
+    def identify_column(self, x: int) -> int:
+        return int(self.tree.identify_column(x).replace("#", "")) - 1
+
+
+    def item_at(self, index: int) -> Any:
+        return self.items[index]
+
+
+    def selection(self) -> List[str]:
+        return [self.row_key(item) for item in self.items if self.row_key(item) in self.selected_keys]
+
+
+    def select_index(self, index: int) -> None:
+        self.selected_keys = {self.row_key(self.items[index])}
+        self._sync_selection()
+
+
+    def yview(self, *args) -> None:
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self.items)))
+        elif args[0] == "scroll":
+            self._scroll_by(int(args[1]), args[2])
+
+
+    def refresh(self) -> None:
+        window = self.items[self.offset:self.offset + self.visible_rows + self.margin]
+
+        while len(self.slots) < len(window):
+            self.slots.append(self.tree.insert("", "end"))
+        while len(self.slots) > len(window):
+            self.tree.delete(self.slots.pop())
+
+        for slot, item in zip(self.slots, window):
+            self.tree.item(slot, values=self.row_values(item))
+
+        self._sync_selection()
+        self._update_scrollbar()
+
+
+    def _scroll_by(self, amount: int, what: str) -> str:
+        step = self.visible_rows if what == "pages" else 3
+        self._scroll_to(self.offset + amount * step)
+        return "break"
+
+
+    def _scroll_to(self, offset: int) -> None:
+        offset = max(0, min(offset, len(self.items) - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+
+    def _update_scrollbar(self) -> None:
+        total = len(self.items)
+        if total <= self.visible_rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.visible_rows) / total)
+
+
+    def _sync_selection(self) -> None:
+        window = self.items[self.offset:self.offset + len(self.slots)]
+        selected = [slot for slot, item in zip(self.slots, window) if self.row_key(item) in self.selected_keys]
+        if tuple(selected) != self.tree.selection():
+            self.tree.selection_set(selected)
+
+
+    def _on_select(self, event) -> None:
+        window = self.items[self.offset:self.offset + len(self.slots)]
+        window_keys = {self.row_key(item) for item in window}
+        selected = set(self.tree.selection())
+        self.selected_keys -= window_keys
+        self.selected_keys |= {self.row_key(item) for slot, item in zip(self.slots, window) if slot in selected}
+
+
+    def _on_configure(self, event) -> None:
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        heading_height = row_height + 5
+        visible_rows = max(1, (event.height - heading_height) // row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self._scroll_to(self.offset)
+            self.refresh()
@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+
+import threading
+from modules.fake_youtube import FakeYouTube, synthetic_comments
+from utils.comment_fetcher import CommentPageFetcher
+from utils.youtube_client import YouTubeClientPool
+
+
+def test_abandoned_iteration_releases_its_lease():
+    youtube = FakeYouTube({"video": synthetic_comments(2_000)})
+    client_pool = YouTubeClientPool(lambda: youtube, size=2)
+
+    for _ in range(2):
+        for page in CommentPageFetcher(client_pool, "video", prefetch=1, replies=False):
+            break       # The producer is still paging when the consumer leaves.
+
+    leased = threading.Event()
+    def lease() -> None:
+        with client_pool.lease():
+            leased.set()
+    threading.Thread(target=lease, daemon=True).start()
+    assert leased.wait(timeout=5)
@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.append(str(ROOT_DIR))
+
+import threading
+from utils.comment_table import CommentTable
+
+
+def test_concurrent_extend_keeps_columns_aligned():
+    table = CommentTable()
+    start = threading.Barrier(8)
+
+    def append_pages(worker: int) -> None:
+        start.wait()
+        for page in range(50):
+            table.extend([{"id": f"{worker}-{page}-{i}", "text": f"text {worker}-{page}-{i}",
+                           "author": f"@author{i % 7}", "video_id": f"video{worker}"} for i in range(100)])
+
+    workers = [threading.Thread(target=append_pages, args=(worker,)) for worker in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert len(table) == 8 * 50 * 100
+    assert len(set(table.column("id"))) == len(table)
+    for comment in table:
+        assert comment["text"] == f"text {comment['id']}"
+        assert comment["video_id"] == f"video{comment['id'].split('-')[0]}"
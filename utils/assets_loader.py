@@ -1,29 +1,116 @@
-from typing import Optional
-from sklearn.base import BaseEstimator
-from joblib import load
-from tkinter import messagebox
+import time
+from concurrent.futures import Future
+from threading import Thread
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
 from config.config import Config
+from utils.comment_store import CommentStore
+from utils.compact_model import CompactTextClassifier
+from utils.keyword_matcher import KeywordMatcher
 from utils.logger import logger
+from utils.metrics import timed
+from utils.moderation_journal import ModerationJournal
+from utils.prediction_cache import PredictionCache, model_fingerprint
+from utils.spam_tiers import TierPolicy
 
+if TYPE_CHECKING:
+    from sklearn.base import BaseEstimator
 
-def load_logs() -> str:
-    try:
-        with open(Config.LOGS_PATH, "r", encoding="utf-8") as f:
-            logs = f.read()
-            return logs
 
-    except Exception as e:
-        messagebox.showerror("Error", "Logs failed to load.")
+def model_version() -> str:
+    if Config.MODEL_PATH.exists():
+        return model_fingerprint(Config.MODEL_PATH)
+    return model_fingerprint(Config.COMPACT_MODEL_PATH)
+
+
+def load_compact_model() -> Optional[CompactTextClassifier]:
+    if not Config.COMPACT_MODEL_PATH.exists():
         return None
 
+    model = CompactTextClassifier.load(Config.COMPACT_MODEL_PATH)
+    if Config.MODEL_PATH.exists() and model.source_fingerprint != model_fingerprint(Config.MODEL_PATH):
+        logger("Compact model does not match model.pkl, falling back to model.pkl.", 'WARNING')
+        return None
+    return model
 
-def load_model() -> Optional[BaseEstimator]:
+
+def load_model() -> Optional["BaseEstimator"]:
     try:
-        model = load(Config.MODEL_PATH)
+        with timed("model_load_seconds"):
+            model = load_compact_model()
+            if model is not None:
+                logger("Compact model loaded.", 'INFO')
+                return model
+
+            from joblib import load     # Deferred: pulls in scikit-learn.
+            model = load(Config.MODEL_PATH)
         logger("Model loaded.", 'INFO')
         return model
 
     except Exception as e:
         logger(f"Model failed to load: {e}", 'ERROR')
-        messagebox.showerror("Error", "Model failed to load.")
+        return None
+
+
+def model_path(model: Any) -> Path:
+    # The file a loaded model came from, for worker processes to load it again.
+    return Config.COMPACT_MODEL_PATH if isinstance(model, CompactTextClassifier) else Config.MODEL_PATH
+
+
+def load_model_async() -> "Future[Optional[BaseEstimator]]":
+    handle = Future()
+
+    def load_service() -> None:
+        started_at = time.perf_counter()
+        model = load_model()
+        try:
+            if model is not None:
+                with timed("model_warmup_seconds"):
+                    model.predict([""])     # Warm-up.
+                logger(f"Model ready in {time.perf_counter() - started_at:.2f}s.", 'INFO')
+        except Exception as e:
+            logger(f"Model warm-up failed: {e}", 'WARNING')
+        handle.set_result(model)
+
+    Thread(target=load_service, daemon=True).start()
+    return handle
+
+
+def load_tier_policy() -> TierPolicy:
+    started_at = time.perf_counter()
+    matcher = KeywordMatcher(Config.SPAM_KEYWORDS) if Config.SPAM_KEYWORDS else None
+    if matcher is not None:
+        logger(f"Keyword matcher built from {len(matcher)} term(s) in {time.perf_counter() - started_at:.3f}s.", 'INFO')
+    return TierPolicy(matcher, Config.AUTO_REMOVE_THRESHOLD, Config.REVIEW_THRESHOLD)
+
+
+def load_prediction_cache() -> Optional[PredictionCache]:
+    try:
+        cache = PredictionCache(model_version(), Config.PREDICTION_CACHE_PATH, Config.PREDICTION_CACHE_SIZE)
+        logger(f"Prediction cache opened for model {cache.fingerprint}.", 'INFO')
+        return cache
+
+    except Exception as e:
+        logger(f"Prediction cache failed to open: {e}", 'WARNING')
+        return None
+
+
+def load_comment_store() -> Optional[CommentStore]:
+    try:
+        return CommentStore(Config.COMMENT_STORE_PATH)
+
+    except Exception as e:
+        logger(f"Comment store failed to open: {e}", 'WARNING')
+        return None
+
+
+def load_moderation_journal() -> Optional[ModerationJournal]:
+    try:
+        journal = ModerationJournal(Config.MODERATION_JOURNAL_PATH)
+        for job in journal.pending():
+            logger(f"Unfinished moderation job: {job.describe()}", 'WARNING')
+        return journal
+
+    except Exception as e:
+        logger(f"Moderation journal failed to open: {e}", 'WARNING')
         return None
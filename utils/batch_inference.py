@@ -0,0 +1,107 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence
+import numpy as np
+from utils.compact_model import CompactTextClassifier
+from utils.logger import logger
+from utils.spam_tiers import spam_scores
+
+
+PARALLEL_THRESHOLD = 100_000        # Below this, starting workers costs more than it saves.
+
+_worker_model = None
+
+
+def _init_worker(model_path: str) -> None:
+    # Runs once per worker process, so the model is unpickled once per worker rather than per chunk.
+    global _worker_model
+    path = Path(model_path)
+    if path.suffix == ".npz":
+        _worker_model = CompactTextClassifier.load(path)
+    else:
+        from joblib import load     # Deferred: pulls in scikit-learn.
+        _worker_model = load(path)
+
+
+def _score_chunk(texts: Sequence[str]) -> np.ndarray:
+    return spam_scores(_worker_model, texts)
+
+
+class BatchPredictor:
+    def __init__(self,
+                 model: Any,
+                 model_path: Path,
+                 workers: int = 0,
+                 chunk_size: int = 20_000,
+                 parallel_threshold: int = PARALLEL_THRESHOLD) -> None:
+        self.model = model
+        self.model_path = model_path
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.parallel_threshold = parallel_threshold
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+
+    def scores(self, texts: Sequence[str]) -> np.ndarray:
+        # Same result as spam_scores(model, texts).
+        chunks = list(self.iter_scores(texts))
+        return np.concatenate(chunks) if chunks else np.array([], dtype=np.float64)
+
+
+    def iter_scores(self, texts: Sequence[str]) -> Iterator[np.ndarray]:
+        # Scores chunk by chunk in input order. At most 2 chunks per worker are in flight, so memory
+        # is bounded by the chunk size, not by the number of texts.
+        chunks = (texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size))
+        if self.workers <= 1 or len(texts) < self.parallel_threshold:
+            for chunk in chunks:
+                yield spam_scores(self.model, chunk)
+            return
+
+        pending = deque()
+        try:
+            executor = self._get_executor()
+            for chunk in chunks:
+                # Queued before it is submitted, so a pool that breaks on submit still leaves it to redo.
+                entry = [chunk, None]
+                pending.append(entry)
+                entry[1] = executor.submit(_score_chunk, chunk)
+                if len(pending) >= self.workers * 2:
+                    yield self._next_result(pending)
+            while pending:
+                yield self._next_result(pending)
+
+        except BrokenProcessPool as e:
+            # A worker died (usually out of memory); finish in this process.
+            logger(f"Inference workers failed, continuing in-process: {e}", 'WARNING')
+            self.close()
+            for chunk, _ in pending:
+                yield spam_scores(self.model, chunk)
+            for chunk in chunks:
+                yield spam_scores(self.model, chunk)
+
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+    def _next_result(self, pending: deque) -> np.ndarray:
+        scores = pending[0][1].result()
+        pending.popleft()       # Only once done, so a failed chunk is redone in-process.
+        return scores
+
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Started on first use and kept, so later runs skip the model load.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(str(self.model_path),)
+            )
+        return self._executor
@@ -0,0 +1,175 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from utils.comment_fetcher import CommentPageFetcher
+from utils.youtube_client import YouTubeClientPool
+
+
+@dataclass
+class VideoSweepResult:
+    video_id: str
+    pages: int = 0
+    comments: int = 0
+    flagged: List[Dict[str, str]] = field(default_factory=list)
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def rate(self) -> float:
+        return self.comments / self.elapsed if self.elapsed > 0 else 0.0
+
+
+@dataclass
+class SweepReport:
+    results: List[VideoSweepResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def comments(self) -> int:
+        return sum(r.comments for r in self.results)
+
+    @property
+    def flagged(self) -> List[Dict[str, str]]:
+        return [comment for r in self.results for comment in r.flagged]
+
+    @property
+    def failed(self) -> List[VideoSweepResult]:
+        return [r for r in self.results if r.error is not None]
+
+    @property
+    def rate(self) -> float:
+        return self.comments / self.elapsed if self.elapsed > 0 else 0.0
+
+    def describe(self) -> str:
+        return f"Videos: {len(self.results)} ({len(self.failed)} failed) | Comments: {self.comments} | {self.rate:.0f}/s | {self.elapsed:.1f}s"
+
+
+def uploads_playlist_id(client_pool: YouTubeClientPool, channel: str) -> str:
+    # A channel is given either by id (UC...) or by handle (@name).
+    lookup = {"forHandle": channel} if channel.startswith("@") else {"id": channel}
+    with client_pool.lease() as youtube:
+        response = youtube.channels().list(part="contentDetails", **lookup).execute()
+
+    items = response.get("items", [])
+    if not items:
+        raise ValueError(f"Channel not found: {channel}")
+    return items[0]["contentDetails"]["relatedPlaylists"]["uploads"]
+
+
+def list_channel_videos(client_pool: YouTubeClientPool, channel: str, limit: int = 0) -> List[str]:
+    playlist_id = uploads_playlist_id(client_pool, channel)
+    video_ids = []
+    next_page = None
+    with client_pool.lease() as youtube:
+        while True:
+            response = youtube.playlistItems().list(
+                part="contentDetails",
+                playlistId=playlist_id,
+                maxResults=50,
+                pageToken=next_page
+            ).execute()
+            video_ids.extend(item["contentDetails"]["videoId"] for item in response.get("items", []))
+
+            next_page = response.get("nextPageToken")
+            if not next_page or (limit and len(video_ids) >= limit):
+                break
+    return video_ids[:limit] if limit else video_ids
+
+
+class ChannelSweep:
+    def __init__(self,
+                 client_pool: YouTubeClientPool,
+                 max_workers: int = 4,
+                 prefetch: int = 2,
+                 classify: Optional[Callable[[List[Dict[str, str]]], List[Dict[str, str]]]] = None,
+                 replies: bool = True,
+                 reply_workers: int = 2) -> None:
+        self.client_pool = client_pool
+        self.max_workers = max(1, max_workers)
+        self.prefetch = prefetch
+        self.replies = replies
+        self.reply_workers = reply_workers
+        self.classify = classify
+        self.cancel_event = threading.Event()
+
+        self._fetchers: Dict[str, CommentPageFetcher] = {}
+        self._lock = threading.Lock()
+
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+        with self._lock:
+            for fetcher in self._fetchers.values():
+                fetcher.cancel()
+
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+
+    def run(self,
+            video_ids: List[str],
+            on_page: Optional[Callable[[str, List[Dict[str, str]]], None]] = None,
+            on_video: Optional[Callable[[VideoSweepResult, int, int], None]] = None) -> SweepReport:
+        started_at = time.perf_counter()
+        report = SweepReport()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._sweep_video, video_id, on_page) for video_id in video_ids]
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    continue
+                report.results.append(result)
+                if on_video is not None:
+                    on_video(result, len(report.results), len(video_ids))
+
+        # Keep the channel's upload order whatever order the videos finished in.
+        order = {video_id: index for index, video_id in enumerate(video_ids)}
+        report.results.sort(key=lambda r: order[r.video_id])
+        report.elapsed = time.perf_counter() - started_at
+        return report
+
+
+    def _sweep_video(self,
+                     video_id: str,
+                     on_page: Optional[Callable[[str, List[Dict[str, str]]], None]]) -> Optional[VideoSweepResult]:
+        if self.cancelled:
+            return None
+
+        fetcher = CommentPageFetcher(
+            self.client_pool, 
+            video_id, 
+            prefetch=self.prefetch, 
+            replies=self.replies, 
+            reply_workers=self.reply_workers
+        )
+        with self._lock:
+            self._fetchers[video_id] = fetcher
+
+        result = VideoSweepResult(video_id)
+        started_at = time.perf_counter()
+        try:
+            for page in fetcher:
+                for comment in page:
+                    comment["video_id"] = video_id
+                result.pages += 1
+                result.comments += len(page)
+                if self.classify is not None:
+                    result.flagged.extend(self.classify(page))
+                if on_page is not None:
+                    on_page(video_id, page)
+
+        except Exception as e:
+            # Comments disabled or a deleted video must not stop the rest of the channel.
+            result.error = str(e)
+
+        finally:
+            with self._lock:
+                self._fetchers.pop(video_id, None)
+
+        result.elapsed = time.perf_counter() - started_at
+        return result
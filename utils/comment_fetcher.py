@@ -0,0 +1,226 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from queue import Queue, Empty, Full
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from utils.metrics import timed
+from utils.youtube_client import YouTubeClientPool
+
+
+@dataclass
+class FetchProgress:
+    pages: int = 0
+    comments: int = 0
+    replies: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def rate(self) -> float:
+        elapsed = self.elapsed
+        return self.comments / elapsed if elapsed > 0 else 0.0
+
+    def describe(self) -> str:
+        replies = f" ({self.replies} replies)" if self.replies else ""
+        return f"Pages: {self.pages} | Comments: {self.comments}{replies} | {self.rate:.0f}/s"
+
+
+def parse_comment(resource: dict) -> Dict[str, str]:
+    snippet = resource["snippet"]
+    comment = {
+        "id": resource["id"],
+        "author": snippet["authorDisplayName"],
+        "text": snippet["textOriginal"],
+        "published_at": snippet.get("publishedAt", "")
+    }
+    if "parentId" in snippet:
+        comment["parent_id"] = snippet["parentId"]
+    return comment
+
+
+def has_more_replies(thread: dict) -> bool:
+    # A thread carries at most a handful of replies inline; the rest need comments.list.
+    inline = thread.get("replies", {}).get("comments", [])
+    return thread["snippet"].get("totalReplyCount", 0) > len(inline)
+
+
+def parse_comment_threads(response: dict) -> List[Dict[str, str]]:
+    comments = []
+    for item in response.get("items", []):
+        comments.append(parse_comment(item["snippet"]["topLevelComment"]))
+        if not has_more_replies(item):
+            comments.extend(parse_comment(reply) for reply in item.get("replies", {}).get("comments", []))
+    return comments
+
+
+class CommentPageFetcher:
+    _DONE = object()
+
+    def __init__(self, 
+                 client_pool: YouTubeClientPool, 
+                 video_id: str, 
+                 prefetch: int = 2, 
+                 page_size: int = 100, 
+                 order: str = "time",
+                 replies: bool = True,
+                 reply_workers: int = 2,
+                 reply_filter: Optional[Callable[[Dict[str, int]], List[str]]] = None) -> None:
+        # reply_filter gets {thread id: totalReplyCount} for threads too long to come inline
+        # and returns the ones whose replies are still wanted.
+        self.client_pool = client_pool
+        self.video_id = video_id
+        self.page_size = page_size
+        self.order = order
+        self.replies = replies
+        self.reply_workers = max(1, reply_workers)
+        self.reply_filter = reply_filter
+        self.reply_errors: List[Tuple[str, str]] = []
+        self.progress = FetchProgress()
+        self.cancel_event = threading.Event()
+        self.stop_event = threading.Event()
+
+        self._responses: Queue = Queue(maxsize=max(1, prefetch))
+
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+
+    def stop(self) -> None:
+        # Ends top-level paging; reply fetches already started still arrive. cancel() drops those too.
+        self.stop_event.set()
+
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+
+    @property
+    def halted(self) -> bool:
+        return self.cancel_event.is_set() or self.stop_event.is_set()
+
+
+    def __iter__(self) -> Iterator[List[Dict[str, str]]]:
+        self.progress = FetchProgress()
+        producer = threading.Thread(target=self._produce, daemon=True)
+        producer.start()
+
+        # Long reply threads are fetched next to the top-level paging, not after it.
+        executor = ThreadPoolExecutor(max_workers=self.reply_workers) if self.replies else None
+        pending_replies = 0
+        producer_done = False
+        try:
+            while not (producer_done and pending_replies == 0):
+                response = self._next_response()
+                if self.cancelled:
+                    break
+                if response is self._DONE:
+                    producer_done = True
+                    continue
+
+                if isinstance(response, list):
+                    pending_replies -= 1
+                    page = response
+                    self.progress.replies += len(page)
+                elif self.stop_event.is_set():
+                    continue        # Paged ahead of the stop, or failed doing so; only replies are still wanted.
+                elif isinstance(response, Exception):
+                    raise response
+                else:
+                    page = parse_comment_threads(response)
+                    self.progress.pages += 1
+                    self.progress.replies += sum(1 for comment in page if "parent_id" in comment)
+                    if executor is not None:
+                        long_threads = {t["id"]: t["snippet"].get("totalReplyCount", 0) for t in response.get("items", []) if has_more_replies(t)}
+                        if long_threads and self.reply_filter is not None:
+                            long_threads = self.reply_filter(long_threads)
+                        for thread_id in long_threads:
+                            executor.submit(self._fetch_replies, thread_id)
+                            pending_replies += 1
+
+                self.progress.comments += len(page)
+                if page:
+                    yield page
+
+        finally:
+            # Reached early when the consumer stops iterating; the producer and reply fetches
+            # must exit too, or they keep their pool leases forever.
+            if not (producer_done and pending_replies == 0):
+                self.cancel()
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+
+    def _next_response(self):
+        while True:
+            try:
+                return self._responses.get(timeout=0.1)
+            except Empty:
+                if self.cancelled:
+                    return self._DONE
+
+
+    def _produce(self) -> None:
+        next_page = None
+        try:
+            with self.client_pool.lease() as youtube:
+                while not self.halted:
+                    with timed("page_fetch_seconds"):
+                        response = youtube.commentThreads().list(
+                            part="snippet,replies" if self.replies else "snippet",
+                            videoId=self.video_id,
+                            maxResults=self.page_size,
+                            order=self.order,
+                            pageToken=next_page
+                        ).execute()
+                    self._put(response)
+
+                    next_page = response.get("nextPageToken")
+                    if not next_page:
+                        break
+
+        except Exception as e:
+            self._put(e)
+
+        self._put(self._DONE)
+
+
+    def _fetch_replies(self, parent_id: str) -> None:
+        replies = []
+        next_page = None
+        try:
+            with self.client_pool.lease() as youtube:
+                while not self.cancelled:
+                    with timed("reply_fetch_seconds"):
+                        response = youtube.comments().list(
+                            part="snippet",
+                            parentId=parent_id,
+                            maxResults=100,
+                            textFormat="plainText",
+                            pageToken=next_page
+                        ).execute()
+                    replies.extend(parse_comment(reply) for reply in response.get("items", []))
+
+                    next_page = response.get("nextPageToken")
+                    if not next_page:
+                        break
+
+        except Exception as e:
+            # A thread deleted mid-load must not fail the whole video.
+            self.reply_errors.append((parent_id, str(e)))
+
+        self._put(replies)
+
+
+    def _put(self, item) -> None:
+        while not self.cancelled:
+            try:
+                self._responses.put(item, timeout=0.1)
+                return
+            except Full:
+                continue
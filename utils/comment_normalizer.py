@@ -1,10 +1,48 @@
 import re
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence
+
+
+REPEATED_SPACES = re.compile(r"\s{2,}")
+REPEATED_NEWLINES = re.compile(r"\n\s*\n+")
+
+PARALLEL_THRESHOLD = 200_000
 
 
 def normalize_comment(text: str) -> str:
     text = text.strip()
     text = unicodedata.normalize("NFKC", text)
-    text = re.sub(r"\s{2,}", " ", text)
-    text = re.sub(r"\n\s*\n+", "\n", text)
+    text = REPEATED_SPACES.sub(" ", text)
+    text = REPEATED_NEWLINES.sub("\n", text)
     return text.lower()
+
+
+def _normalize_batch(texts: Sequence[str]) -> List[str]:
+    # Same steps as normalize_comment. NFKC leaves ASCII untouched, and once every
+    # whitespace run is collapsed REPEATED_NEWLINES can no longer match.
+    normalize = unicodedata.normalize
+    collapse = REPEATED_SPACES.sub
+    normalized = []
+    append = normalized.append
+    for text in texts:
+        text = text.strip()
+        if not text.isascii():
+            text = normalize("NFKC", text)
+        append(collapse(" ", text).lower())
+    return normalized
+
+
+def normalize_comments(texts: Sequence[str],
+                       workers: int = 0,
+                       chunk_size: int = 50_000,
+                       parallel_threshold: int = PARALLEL_THRESHOLD) -> List[str]:
+    if workers <= 1 or len(texts) < parallel_threshold:
+        return _normalize_batch(texts)
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    normalized = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in executor.map(_normalize_batch, chunks):
+            normalized.extend(chunk)
+    return normalized
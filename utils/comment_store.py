@@ -0,0 +1,158 @@
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+class CommentStore:
+    _QUERY_CHUNK = 500
+
+    def __init__(self, path: Path) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS comments (
+                    id TEXT PRIMARY KEY,
+                    video_id TEXT NOT NULL,
+                    author TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    published_at TEXT NOT NULL DEFAULT '',
+                    moderation_status TEXT NOT NULL DEFAULT 'published'
+                )""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS comments_by_video ON comments (video_id, published_at)")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS videos (
+                    video_id TEXT PRIMARY KEY,
+                    complete INTEGER NOT NULL DEFAULT 0,
+                    synced_at TEXT
+                )""")
+            self._db.commit()
+
+
+    def load(self, video_id: str) -> List[Dict[str, str]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, author, text, published_at FROM comments "
+                "WHERE video_id = ? AND moderation_status = 'published' ORDER BY published_at DESC",
+                (video_id,)
+            ).fetchall()
+        return [{"id": i, "author": a, "text": t, "published_at": p} for i, a, t, p in rows]
+
+
+    def known_ids(self, comment_ids: List[str]) -> Set[str]:
+        known = set()
+        with self._lock:
+            for i in range(0, len(comment_ids), self._QUERY_CHUNK):
+                chunk = comment_ids[i:i + self._QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                known.update(row[0] for row in self._db.execute(f"SELECT id FROM comments WHERE id IN ({placeholders})", chunk))
+        return known
+
+
+    def ids_with_status(self, comment_ids: List[str], status: str) -> Set[str]:
+        found = set()
+        with self._lock:
+            for i in range(0, len(comment_ids), self._QUERY_CHUNK):
+                chunk = comment_ids[i:i + self._QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(row[0] for row in self._db.execute(
+                    f"SELECT id FROM comments WHERE moderation_status = ? AND id IN ({placeholders})", [status, *chunk]
+                ))
+        return found
+
+
+    def reply_counts(self, thread_ids: Iterable[str]) -> Dict[str, int]:
+        # Published replies only, as totalReplyCount leaves out removed ones. Reply ids are
+        # "<thread id>.<reply id>", so a thread's replies are one primary key range.
+        with self._lock:
+            return {
+                thread_id: self._db.execute(
+                    "SELECT COUNT(*) FROM comments WHERE id > ? AND id < ? AND moderation_status = 'published'",
+                    (thread_id + ".", thread_id + "/")
+                ).fetchone()[0]
+                for thread_id in thread_ids
+            }
+
+
+    def add(self, video_id: str, comments: Iterable[Dict[str, str]]) -> None:
+        rows = [(c["id"], video_id, c["author"], c["text"], c.get("published_at", "")) for c in comments]
+        if not rows:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO comments (id, video_id, author, text, published_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._db.commit()
+
+
+    def is_complete(self, video_id: str) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT complete FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        return bool(row and row[0])
+
+
+    def mark_synced(self, video_id: str, complete: bool) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO videos (video_id, complete, synced_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(video_id) DO UPDATE SET complete = MAX(complete, excluded.complete), synced_at = excluded.synced_at",
+                (video_id, int(complete), datetime.now().isoformat(timespec="seconds"))
+            )
+            self._db.commit()
+
+
+    def set_moderation_status(self, comment_ids: Iterable[str], status: str) -> None:
+        with self._lock:
+            self._db.executemany("UPDATE comments SET moderation_status = ? WHERE id = ?", [(status, i) for i in comment_ids])
+            self._db.commit()
+
+
+class IncrementalSync:
+    def __init__(self, store: CommentStore, video_id: str, recheck_pages: int = 0) -> None:
+        self.store = store
+        self.video_id = video_id
+        self.recheck_pages = recheck_pages
+        self.resume = store.is_complete(video_id)     # Older comments are all stored already.
+        self.reached_known = False
+        self.known_pages = 0
+
+
+    @property
+    def done(self) -> bool:
+        # Known pages past the boundary are still read for recheck_pages, since older threads take new replies too.
+        return self.resume and self.reached_known and self.known_pages > self.recheck_pages
+
+
+    def threads_to_fetch(self, reply_counts: Dict[str, int]) -> List[str]:
+        # A fetcher reply_filter: threads with more replies than stored, including every new thread.
+        stored = self.store.reply_counts(reply_counts)
+        return [thread_id for thread_id, count in reply_counts.items() if count > stored[thread_id]]
+
+
+    def accept(self, page: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        # Pages arrive newest first: unknown comments before the first known one are newer than the store.
+        known = self.store.known_ids([c["id"] for c in page])
+        newer, older = [], []
+        known_thread = False
+        for comment in page:
+            if comment["id"] in known:
+                # Replies arrive out of time order, so only top-level comments mark the boundary.
+                if "parent_id" not in comment:
+                    self.reached_known = known_thread = True
+            elif self.reached_known:
+                older.append(comment)
+            else:
+                newer.append(comment)
+        self.known_pages += known_thread
+
+        self.store.add(self.video_id, newer + older)
+        return newer, older
+
+
+    def finish(self, complete: bool) -> None:
+        self.store.mark_synced(self.video_id, complete)
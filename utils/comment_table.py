@@ -0,0 +1,172 @@
+import threading
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Union
+
+
+_FIELDS = ("id", "author", "text", "published_at", "video_id", "parent_id")
+
+
+class CommentRow(Mapping):
+    # A view of one row, read and written like the comment dict it replaces. It holds the
+    # stable row number, so it stays valid when newer comments are inserted above it.
+    __slots__ = ("table", "row")
+
+    def __init__(self, table: "CommentTable", row: int) -> None:
+        self.table = table
+        self.row = row
+
+
+    def __getitem__(self, key: str) -> Any:
+        return self.table._get(self.row, key)
+
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.table._set(self.row, key, value)
+
+
+    def __iter__(self) -> Iterator[str]:
+        for key in _FIELDS:
+            if key in self:
+                yield key
+        yield from self.table._extra.get(self.row, ())
+
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            self.table._get(self.row, key)
+            return True
+        except KeyError:
+            return False
+
+
+    def __repr__(self) -> str:
+        return f"CommentRow({dict(self)!r})"
+
+
+class CommentTable:
+    # Loaded comments as columns instead of one dict each. Authors and video ids repeat across
+    # comments, so they are stored once and referenced by a 4-byte code. Keys only a few rows have
+    # (replies, and the tier, score, keyword and cluster of flagged comments) are kept sparse.
+    # Writes are atomic, so a channel sweep's workers can append pages to one table.
+    def __init__(self, comments: Iterable[Dict[str, str]] = ()) -> None:
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._published: List[str] = []
+        self._authors = array("I")
+        self._videos = array("I")           # 0 when the comment has no video id.
+        self._parents: Dict[int, str] = {}
+        self._extra: Dict[int, Dict[str, Any]] = {}
+        self._order = array("I")            # Display position -> row.
+        self._in_order = True
+
+        self._strings: List[str] = [""]
+        self._codes: Dict[str, int] = {"": 0}
+        self._lock = threading.Lock()
+        self.extend(comments)
+
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[CommentRow, List[CommentRow]]:
+        if isinstance(index, slice):
+            return [CommentRow(self, row) for row in self._order[index]]
+        return CommentRow(self, self._order[index])
+
+
+    def __iter__(self) -> Iterator[CommentRow]:
+        for row in self._order:
+            yield CommentRow(self, row)
+
+
+    def extend(self, comments: Iterable[Dict[str, str]]) -> None:
+        with self._lock:
+            self._order.extend(self._append(comments))
+
+
+    def insert(self, index: int, comments: Iterable[Dict[str, str]]) -> None:
+        with self._lock:
+            rows = self._append(comments)
+            self._in_order = self._in_order and (index >= len(self._order) or not rows)
+            self._order[index:index] = rows
+
+
+    def column(self, key: str) -> List[Any]:
+        # One field of every comment in display order. While nothing was inserted above
+        # earlier rows, display order is row order and the column is copied in one step.
+        values = {"id": self._ids, "text": self._texts, "published_at": self._published}.get(key)
+        if values is None:
+            return [self._get(row, key) for row in self._order]
+        if self._in_order:
+            return list(values)
+        return [values[row] for row in self._order]
+
+
+    def _append(self, comments: Iterable[Dict[str, str]]) -> array:
+        first = len(self._ids)
+        intern = self._intern
+        for comment in comments:
+            row = len(self._ids)
+            self._ids.append(comment["id"])
+            self._texts.append(comment["text"])
+            self._published.append(comment.get("published_at", ""))
+            self._authors.append(intern(comment.get("author", "")))
+            self._videos.append(intern(comment.get("video_id", "")))
+            if "parent_id" in comment:
+                self._parents[row] = comment["parent_id"]
+            extra = {k: v for k, v in comment.items() if k not in _FIELDS}
+            if extra:
+                self._extra[row] = extra
+        return array("I", range(first, len(self._ids)))
+
+
+    def _intern(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._strings)
+            self._strings.append(value)
+        return code
+
+
+    def _get(self, row: int, key: str) -> Any:
+        if key == "id":
+            return self._ids[row]
+        if key == "text":
+            return self._texts[row]
+        if key == "author":
+            return self._strings[self._authors[row]]
+        if key == "published_at":
+            return self._published[row]
+        if key == "video_id" and self._videos[row]:
+            return self._strings[self._videos[row]]
+        if key == "parent_id" and row in self._parents:
+            return self._parents[row]
+        extra = self._extra.get(row)
+        if key in _FIELDS or extra is None or key not in extra:
+            raise KeyError(key)
+        return extra[key]
+
+
+    def _set(self, row: int, key: str, value: Any) -> None:
+        if key == "video_id":
+            with self._lock:
+                self._videos[row] = self._intern(value)
+        elif key == "parent_id":
+            self._parents[row] = value
+        elif key in _FIELDS:
+            raise KeyError(f"{key} cannot be changed")
+        else:
+            self._extra.setdefault(row, {})[key] = value
+
+
+def column(comments: Union[CommentTable, Sequence[Dict[str, str]]], key: str) -> List[Any]:
+    # Reads a table's column directly instead of going through a view per row.
+    if isinstance(comments, CommentTable):
+        return comments.column(key)
+    return [comment[key] for comment in comments]
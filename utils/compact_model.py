@@ -0,0 +1,150 @@
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+
+
+FORMAT_VERSION = 1
+
+
+def compile_pipeline(pipeline: Any, source_fingerprint: str = "") -> Dict[str, np.ndarray]:
+    vectorizer, classifier = pipeline.steps[0][1], pipeline.steps[-1][1]
+    params = vectorizer.get_params()
+    if params["analyzer"] != "word" or params["tokenizer"] or params["preprocessor"] or params["strip_accents"]:
+        raise ValueError("Only word analyzers with the default tokenizer can be compiled.")
+
+    vocabulary = vectorizer.vocabulary_
+    terms = sorted(vocabulary, key=vocabulary.get)
+    idf = vectorizer.idf_ if params["use_idf"] else np.ones(len(terms))
+    stop_words = vectorizer.get_stop_words()
+
+    config = {
+        "version": FORMAT_VERSION,
+        "lowercase": params["lowercase"],
+        "token_pattern": params["token_pattern"],
+        "ngram_range": list(params["ngram_range"]),
+        "stop_words": sorted(stop_words) if stop_words else [],
+        "binary": params["binary"],
+        "sublinear_tf": params["sublinear_tf"],
+        "norm": params["norm"],
+        "probability": "logistic" if hasattr(classifier, "predict_proba") else "sigmoid",
+        "source_fingerprint": source_fingerprint,
+    }
+    return {
+        "config": np.array(json.dumps(config)),
+        "terms": np.array(terms),
+        "idf": np.asarray(idf, dtype=np.float64),
+        "coef": np.atleast_2d(np.asarray(classifier.coef_, dtype=np.float64)),
+        "intercept": np.atleast_1d(np.asarray(classifier.intercept_, dtype=np.float64)),
+        "classes": np.asarray(classifier.classes_),
+    }
+
+
+def save_compact_model(pipeline: Any, path: Path, source_fingerprint: str = "") -> None:
+    with open(path, "wb") as f:
+        np.savez_compressed(f, **compile_pipeline(pipeline, source_fingerprint))
+
+
+class CompactTextClassifier:
+    def __init__(self, arrays: Dict[str, np.ndarray]) -> None:
+        self.config = json.loads(str(arrays["config"]))
+        self.idf = arrays["idf"]
+        self.coef = arrays["coef"]
+        self.intercept = arrays["intercept"]
+        self.classes_ = arrays["classes"]
+        self.vocabulary = {term: index for index, term in enumerate(arrays["terms"].tolist())}
+
+        self._token_pattern = re.compile(self.config["token_pattern"])
+        self._stop_words = frozenset(self.config["stop_words"])
+        self._min_n, self._max_n = self.config["ngram_range"]
+
+
+    @classmethod
+    def load(cls, path: Path) -> "CompactTextClassifier":
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls({key: arrays[key] for key in arrays.files})
+
+
+    @property
+    def source_fingerprint(self) -> str:
+        return self.config.get("source_fingerprint", "")
+
+
+    def analyze(self, text: str) -> List[str]:
+        if self.config["lowercase"]:
+            text = text.lower()
+        tokens = self._token_pattern.findall(text)
+        if self._stop_words:
+            tokens = [t for t in tokens if t not in self._stop_words]
+        if self._max_n == 1:
+            return tokens
+
+        ngrams = tokens if self._min_n == 1 else []
+        for n in range(max(2, self._min_n), self._max_n + 1):
+            ngrams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return ngrams
+
+
+    def decision_function(self, texts: Sequence[str]) -> np.ndarray:
+        vocabulary = self.vocabulary
+        docs, terms = [], []
+        for index, text in enumerate(texts):
+            ids = [vocabulary[t] for t in self.analyze(text) if t in vocabulary]
+            docs.extend([index] * len(ids))
+            terms.extend(ids)
+
+        n_terms = len(self.idf)
+        pairs, counts = np.unique(np.asarray(docs, dtype=np.int64) * n_terms + np.asarray(terms, dtype=np.int64), return_counts=True)
+        docs, terms = pairs // n_terms, pairs % n_terms
+
+        tf = counts.astype(np.float64)
+        if self.config["binary"]:
+            tf[:] = 1.0
+        elif self.config["sublinear_tf"]:
+            tf = np.log(tf) + 1.0
+        weights = tf * self.idf[terms]
+
+        norm = self.config["norm"]
+        if norm:
+            sums = np.bincount(docs, weights=weights ** 2 if norm == "l2" else np.abs(weights), minlength=len(texts))
+            sums = np.sqrt(sums) if norm == "l2" else sums
+            sums[sums == 0.0] = 1.0
+            weights = weights / sums[docs]
+
+        scores = np.empty((len(texts), len(self.coef)))
+        for row, coef in enumerate(self.coef):
+            scores[:, row] = np.bincount(docs, weights=weights * coef[terms], minlength=len(texts))
+        scores += self.intercept
+        return scores[:, 0] if len(self.coef) == 1 else scores
+
+
+    def predict(self, texts: Sequence[str]) -> np.ndarray:
+        scores = self.decision_function(texts)
+        if scores.ndim == 1:
+            return self.classes_[(scores > 0).astype(np.int64)]
+        return self.classes_[scores.argmax(axis=1)]
+
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        # Exact for logistic regression; an uncalibrated sigmoid of the margin otherwise.
+        scores = self.decision_function(texts)
+        if scores.ndim == 1:
+            positive = 1.0 / (1.0 + np.exp(-scores))
+            return np.column_stack([1.0 - positive, positive])
+        exp = np.exp(scores - scores.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+def verify_compact_model(pipeline: Any, compact: CompactTextClassifier, texts: Sequence[str]) -> Optional[str]:
+    expected = pipeline.predict(texts)
+    predicted = compact.predict(texts)
+    mismatches = int((expected != predicted).sum())
+    if mismatches:
+        return f"{mismatches} of {len(texts)} prediction(s) differ."
+
+    if hasattr(pipeline, "decision_function"):
+        expected_scores = pipeline.decision_function(texts)
+        if not np.allclose(expected_scores, compact.decision_function(texts), atol=1e-9):
+            return "Decision scores differ."
+    return None
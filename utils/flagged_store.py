@@ -0,0 +1,69 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+from utils.comment_normalizer import normalize_comment
+
+
+class FlaggedStore:
+    def __init__(self, comments: Iterable[Dict[str, str]] = ()) -> None:
+        # Dicts keep insertion order and delete in O(1), so the id index is also the ordering.
+        self._comments: Dict[str, Dict[str, str]] = {}
+        self._by_author: Dict[str, Dict[str, None]] = {}     # Author -> ids, an ordered set.
+        self._normalized: Dict[str, str] = {}                # Filled on the first text search.
+        for comment in comments:
+            self.add(comment)
+
+
+    def __len__(self) -> int:
+        return len(self._comments)
+
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter(self._comments.values())
+
+
+    def __contains__(self, comment_id: str) -> bool:
+        return comment_id in self._comments
+
+
+    def add(self, comment: Dict[str, str]) -> None:
+        self._comments[comment["id"]] = comment
+        self._by_author.setdefault(comment.get("author", ""), {})[comment["id"]] = None
+
+
+    def get(self, comment_id: str) -> Optional[Dict[str, str]]:
+        return self._comments.get(comment_id)
+
+
+    def ids(self) -> List[str]:
+        return list(self._comments)
+
+
+    def ids_by_author(self, authors: Iterable[str]) -> List[str]:
+        return [i for author in set(authors) for i in self._by_author.get(author, ())]
+
+
+    def ids_matching(self, query: str) -> List[str]:
+        # Case and Unicode lookalike insensitive substring match, as the classifier sees the text.
+        query = normalize_comment(query)
+        if not query:
+            return []
+        normalized = self._normalized
+        for comment_id, comment in self._comments.items():
+            if comment_id not in normalized:
+                normalized[comment_id] = normalize_comment(comment["text"])
+        return [i for i in self._comments if query in normalized[i]]
+
+
+    def remove(self, comment_ids: Iterable[str]) -> List[Dict[str, str]]:
+        # Removed comments in the order given; unknown ids are skipped.
+        removed = []
+        for comment_id in comment_ids:
+            comment = self._comments.pop(comment_id, None)
+            if comment is None:
+                continue
+            author = comment.get("author", "")
+            self._by_author[author].pop(comment_id, None)
+            if not self._by_author[author]:
+                del self._by_author[author]
+            self._normalized.pop(comment_id, None)
+            removed.append(comment)
+        return removed
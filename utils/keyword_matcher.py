@@ -0,0 +1,58 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence
+from utils.comment_normalizer import normalize_comment
+
+
+class KeywordMatcher:
+    def __init__(self, terms: Iterable[str]) -> None:
+        # Aho-Corasick automaton with the failure links folded into the transitions,
+        # so a scan is one dict lookup per character whatever the number of terms.
+        self.terms = sorted({normalize_comment(term) for term in terms if term.strip()})
+        self._delta: List[Dict[str, int]] = [{}]
+        self._output: List[Optional[str]] = [None]
+
+        for term in self.terms:
+            state = 0
+            for char in term:
+                if char not in self._delta[state]:
+                    self._delta.append({})
+                    self._output.append(None)
+                    self._delta[state][char] = len(self._delta) - 1
+                state = self._delta[state][char]
+            self._output[state] = term
+
+        root = self._delta[0]
+        failure = [0] * len(self._delta)
+        queue = deque(root.values())
+        while queue:
+            state = queue.popleft()
+            transitions = self._delta[state]
+            children = list(transitions.items())
+            # States are visited breadth first, so the failure state is already complete.
+            for char, target in self._delta[failure[state]].items():
+                transitions.setdefault(char, target)
+            for char, target in children:
+                failure[target] = self._delta[failure[state]].get(char, 0)
+                if self._output[target] is None:
+                    self._output[target] = self._output[failure[target]]
+                queue.append(target)
+
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+
+    def search(self, text: str) -> Optional[str]:
+        # First term found in a normalized text, or None.
+        delta, output = self._delta, self._output
+        state = 0
+        for char in text:
+            state = delta[state].get(char, 0)
+            if output[state] is not None:
+                return output[state]
+        return None
+
+
+    def search_many(self, texts: Sequence[str]) -> List[Optional[str]]:
+        search = self.search
+        return [search(text) for text in texts]
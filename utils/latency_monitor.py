@@ -0,0 +1,93 @@
+import socket
+import ssl
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class LatencySnapshot:
+    last: Optional[float]
+    p50: float
+    p95: float
+    samples: int
+
+    def describe(self) -> str:
+        if self.last is None:
+            return "Disconnected"
+        return f"{self.last:.0f} ms (p50 {self.p50:.0f}, p95 {self.p95:.0f})"
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LatencyMonitor:
+    def __init__(self, 
+                 host: str, 
+                 port: int = 443, 
+                 use_tls: bool = True, 
+                 interval: float = 1.0, 
+                 window: int = 60, 
+                 timeout: float = 2.0) -> None:
+        self.host = host
+        self.port = port
+        self.use_tls = use_tls
+        self.interval = interval
+        self.timeout = timeout
+
+        self._samples = deque(maxlen=window)
+        self._last: Optional[float] = None
+        self._probed = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ssl_context = ssl.create_default_context() if use_tls else None
+
+
+    def start(self) -> None:
+        self._stop.clear()
+        threading.Thread(target=self._monitor_service, daemon=True).start()
+
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+    def probe(self) -> Optional[float]:
+        started_at = time.perf_counter()
+        try:
+            with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+                if self._ssl_context is not None:
+                    with self._ssl_context.wrap_socket(sock, server_hostname=self.host):
+                        pass
+            return (time.perf_counter() - started_at) * 1000
+
+        except OSError:
+            return None
+
+
+    def snapshot(self) -> Optional[LatencySnapshot]:
+        with self._lock:
+            if not self._probed:
+                return None
+            samples = list(self._samples)
+            last = self._last
+
+        if not samples:
+            return LatencySnapshot(last, 0.0, 0.0, 0)
+        return LatencySnapshot(last, percentile(samples, 0.5), percentile(samples, 0.95), len(samples))
+
+
+    def _monitor_service(self) -> None:
+        while not self._stop.is_set():
+            latency = self.probe()
+            with self._lock:
+                self._probed = True
+                self._last = latency
+                if latency is not None:
+                    self._samples.append(latency)
+            self._stop.wait(self.interval)
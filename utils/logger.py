@@ -1,11 +1,151 @@
+import atexit
+import json
+import os
+import threading
+import time
 from datetime import datetime
+from pathlib import Path
+from queue import Queue, Empty
 from config.config import Config
-from typing import Literal
+from typing import List, Literal, Optional, Tuple
+
+
+class LogWriter:
+    def __init__(self,
+                 path: Path,
+                 max_bytes: int = 0,
+                 backup_count: int = 0,
+                 fmt: Literal["text", "jsonl"] = "text",
+                 batch_size: int = 256,
+                 flush_interval: float = 0.5) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._records: Queue = Queue()
+        self._thread = threading.Thread(target=self._writer_service, daemon=True)
+        self._thread.start()
+
+
+    def write(self, timestamp: str, level: str, message: str) -> None:
+        self._records.put((timestamp, level, message))
+
+
+    def flush(self) -> None:
+        self._records.join()
+
+
+    def format(self, record: Tuple[str, str, str]) -> str:
+        timestamp, level, message = record
+        if self.fmt == "jsonl":
+            return json.dumps({"time": timestamp, "level": level, "message": message}, ensure_ascii=False) + "\n"
+        return f"[{timestamp}] [{level}] {message}\n"
+
+
+    def _writer_service(self) -> None:
+        while True:
+            batch = [self._records.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._records.get(timeout=remaining))
+                except Empty:
+                    break
+
+            try:
+                self._write_batch("".join(self.format(record) for record in batch))
+            except Exception:
+                pass        # Logging must never take the app down.
+            finally:
+                for _ in batch:
+                    self._records.task_done()
+
+
+    def _write_batch(self, text: str) -> None:
+        data = text.encode("utf-8")
+        if self.max_bytes and self.path.exists() and self.path.stat().st_size + len(data) > self.max_bytes:
+            self._rotate()
+
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+
+    def _rotate(self) -> None:
+        if self.backup_count <= 0:
+            open(self.path, "wb").close()
+            return
+
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+
+
+_writer: Optional[LogWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_log_writer() -> LogWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = LogWriter(Config.LOGS_PATH, Config.LOG_MAX_BYTES, Config.LOG_BACKUP_COUNT, Config.LOG_FORMAT)
+            atexit.register(_writer.flush)
+        return _writer
+
+
+def flush_logs() -> None:
+    if _writer is not None:
+        _writer.flush()
 
 
 def logger(message: str, level: Literal["INFO", "WARNING", "ERROR"]):
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    log_text = f"[{timestamp}] [{level}] {message}\n"
+    get_log_writer().write(timestamp, level, message)
+
+
+def format_log_line(line: str) -> str:
+    if not line.startswith("{"):
+        return line
+    try:
+        record = json.loads(line)
+        return f"[{record['time']}] [{record['level']}] {record['message']}\n"
+    except (ValueError, KeyError):
+        return line
+
+
+class LogPager:
+    def __init__(self, path: Path, page_size: int = 64 * 1024) -> None:
+        self.path = Path(path)
+        self.page_size = page_size
+        self.position = self.path.stat().st_size if self.path.exists() else 0
+
+
+    @property
+    def has_more(self) -> bool:
+        return self.position > 0
+
+
+    def previous_page(self) -> List[str]:
+        if not self.has_more:
+            return []
+
+        start = max(0, self.position - self.page_size)
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            data = f.read(self.position - start)
+
+        newline = data.find(b"\n") if start > 0 else -1
+        if -1 < newline < len(data) - 1:       # Start on a whole line.
+            start += newline + 1
+            data = data[newline + 1:]
 
-    with open(Config.LOGS_PATH, "a", encoding="utf-8") as f:
-        f.write(log_text)
+        self.position = start
+        return [format_log_line(line) for line in data.decode("utf-8", errors="replace").splitlines(keepends=True)]
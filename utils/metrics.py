@@ -0,0 +1,177 @@
+import json
+import re
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Literal, Tuple
+from config.config import Config
+
+
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)      # The last slot is +Inf.
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+
+    def quantile(self, q: float) -> float:
+        # Upper bound of the bucket holding the q-th observation.
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "started_at")
+
+    def __init__(self, registry: "MetricsRegistry", name: str) -> None:
+        self.registry = registry
+        self.name = name
+
+
+    def __enter__(self) -> "_Timer":
+        self.started_at = time.perf_counter()
+        return self
+
+
+    def __exit__(self, *exc) -> None:
+        self.registry.observe(self.name, time.perf_counter() - self.started_at)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+
+    def timer(self, name: str):
+        # Disabled: one attribute check and a shared no-op context manager.
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+
+    def count(self, name: str, value: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+
+    def observe(self, name: str, value: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value)
+
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+    def rows(self) -> List[Tuple[str, int, float, float, float, float]]:
+        # (name, count, total, mean, p95, max) for display.
+        with self._lock:
+            rows = [(name, h.count, h.sum, h.mean, h.quantile(0.95), h.max) for name, h in self.histograms.items()]
+            rows += [(name, int(value), value, 0.0, 0.0, 0.0) for name, value in self.counters.items()]
+        return sorted(rows)
+
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {
+                    name: {
+                        "count": h.count,
+                        "sum": h.sum,
+                        "mean": h.mean,
+                        "p50": h.quantile(0.5),
+                        "p95": h.quantile(0.95),
+                        "max": h.max,
+                        "buckets": dict(zip([str(b) for b in h.buckets] + ["+Inf"], h.counts)),
+                    }
+                    for name, h in self.histograms.items()
+                },
+            }
+
+
+    def to_prometheus(self, prefix: str = "ycr_") -> str:
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = prefix + _metric_name(name)
+                lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+            for name, h in sorted(self.histograms.items()):
+                metric = prefix + _metric_name(name)
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip([str(b) for b in h.buckets] + ["+Inf"], h.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines += [f"{metric}_sum {h.sum}", f"{metric}_count {h.count}"]
+        return "\n".join(lines) + "\n"
+
+
+    def export(self, path: Path, fmt: Literal["json", "prometheus"] = "json") -> None:
+        text = self.to_prometheus() if fmt == "prometheus" else json.dumps(self.to_dict(), indent=2)
+        Path(path).write_text(text, encoding="utf-8")
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+metrics = MetricsRegistry(Config.METRICS_ENABLED)
+
+
+def timed(name: str):
+    return metrics.timer(name)
+
+
+def count(name: str, value: float = 1) -> None:
+    metrics.count(name, value)
+
+
+def observe(name: str, value: float) -> None:
+    metrics.observe(name, value)
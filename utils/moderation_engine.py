@@ -0,0 +1,174 @@
+import random
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence
+from googleapiclient.discovery import Resource
+from googleapiclient.errors import HttpError
+from utils.metrics import count, timed
+from utils.quota_scheduler import PRIORITY_MODERATION, QuotaExceeded
+from utils.youtube_client import YouTubeClientPool
+
+
+TRANSIENT_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class ModerationResult:
+    comment_id: str
+    ok: bool
+    error: Optional[str] = None
+    attempts: int = 1
+
+
+@dataclass
+class ModerationReport:
+    results: List[ModerationResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self) -> List[str]:
+        return [r.comment_id for r in self.results if r.ok]
+
+    @property
+    def failed(self) -> List[ModerationResult]:
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def ids_per_second(self) -> float:
+        return len(self.results) / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def is_transient(err: Exception) -> bool:
+    if isinstance(err, HttpError):
+        return err.resp.status in TRANSIENT_STATUSES
+    return isinstance(err, (socket.timeout, TimeoutError, ConnectionError))
+
+
+def is_quota_error(err: Exception) -> bool:
+    if isinstance(err, HttpError):
+        return err.resp.status == 403 and b"quotaExceeded" in (err.content or b"")
+    return isinstance(err, QuotaExceeded)
+
+
+def is_per_id_error(err: Exception) -> bool:
+    # Errors one bad id in the call can cause. Auth and permission errors fail every id alike.
+    if isinstance(err, HttpError):
+        return err.resp.status == 404 or (err.resp.status == 400 and b"processingFailure" in (err.content or b""))
+    return False
+
+
+class ModerationEngine:
+    def __init__(self,
+                 client_pool: YouTubeClientPool,
+                 ids_per_call: int = 50,
+                 max_workers: int = 4,
+                 max_retries: int = 4,
+                 backoff: float = 0.5,
+                 calls_per_batch: int = 0) -> None:
+        self.client_pool = client_pool
+        self.ids_per_call = max(1, ids_per_call)
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.calls_per_batch = calls_per_batch
+
+
+    def run(self,
+            comment_ids: Sequence[str],
+            ban_author: bool = False,
+            status: str = "rejected",
+            on_progress: Optional[Callable[[int, int], None]] = None,
+            on_results: Optional[Callable[[List[ModerationResult]], None]] = None) -> ModerationReport:
+        # on_results gets each finished call's results on this thread, for journaling.
+        started_at = time.perf_counter()
+        report = ModerationReport()
+        chunks = [list(comment_ids[i:i + self.ids_per_call]) for i in range(0, len(comment_ids), self.ids_per_call)]
+
+        if self.calls_per_batch > 1:
+            jobs = [chunks[i:i + self.calls_per_batch] for i in range(0, len(chunks), self.calls_per_batch)]
+            work = lambda group: self._moderate_batch(group, ban_author, status)
+        else:
+            jobs = chunks
+            work = lambda chunk: self._moderate(chunk, ban_author, status)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for future in as_completed([executor.submit(work, job) for job in jobs]):
+                results = future.result()
+                report.results.extend(results)
+                if on_results is not None:
+                    on_results(results)
+                if on_progress is not None:
+                    on_progress(len(report.results), len(comment_ids))
+
+        report.elapsed = time.perf_counter() - started_at
+        return report
+
+
+    def _request(self, youtube: Resource, ids: List[str], ban_author: bool, status: str):
+        return youtube.comments().setModerationStatus(
+            id=",".join(ids),
+            moderationStatus=status,
+            banAuthor=ban_author
+        )
+
+
+    def _sleep(self, attempt: int) -> None:
+        time.sleep(self.backoff * (2 ** (attempt - 1)) * (0.5 + random.random()))
+
+
+    def _moderate(self, ids: List[str], ban_author: bool, status: str) -> List[ModerationResult]:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                with self.client_pool.lease(PRIORITY_MODERATION) as youtube, timed("moderation_call_seconds"):
+                    self._request(youtube, ids, ban_author, status).execute()
+                count("moderation_calls")
+                return [ModerationResult(i, True, attempts=attempt) for i in ids]
+
+            except Exception as e:
+                if is_quota_error(e):
+                    # Splitting would only spend more of a budget that is already gone.
+                    return [ModerationResult(i, False, error=str(e), attempts=attempt) for i in ids]
+
+                if is_transient(e) and attempt <= self.max_retries:
+                    count("moderation_retries")
+                    self._sleep(attempt)
+                    continue
+
+                if len(ids) > 1 and is_per_id_error(e):
+                    # Split so one bad id does not fail the whole call.
+                    count("moderation_splits")
+                    middle = len(ids) // 2
+                    return self._moderate(ids[:middle], ban_author, status) + self._moderate(ids[middle:], ban_author, status)
+
+                return [ModerationResult(i, False, error=str(e), attempts=attempt) for i in ids]
+
+
+    def _moderate_batch(self, chunks: List[List[str]], ban_author: bool, status: str) -> List[ModerationResult]:
+        failed = set()
+
+        def callback(request_id, response, exception) -> None:
+            if exception is not None:
+                failed.add(int(request_id))
+
+        try:
+            with self.client_pool.lease(PRIORITY_MODERATION) as youtube:
+                batch = youtube.new_batch_http_request(callback=callback)
+                for index, chunk in enumerate(chunks):
+                    batch.add(self._request(youtube, chunk, ban_author, status), request_id=str(index))
+                with timed("moderation_batch_seconds"):
+                    batch.execute()
+
+        except Exception:
+            failed = set(range(len(chunks)))
+
+        results = []
+        for index, chunk in enumerate(chunks):
+            if index in failed:
+                results.extend(self._moderate(chunk, ban_author, status))
+            else:
+                results.extend(ModerationResult(i, True) for i in chunk)
+        return results
@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+from utils.logger import logger
+from utils.moderation_engine import ModerationResult
+
+
+@dataclass
+class ModerationJob:
+    job_id: str
+    comment_ids: List[str]
+    ban_author: bool = False
+    created_at: str = ""
+    done: Set[str] = field(default_factory=set)
+    failed: Dict[str, str] = field(default_factory=dict)        # Id -> last error.
+
+    @property
+    def remaining(self) -> List[str]:
+        return [i for i in self.comment_ids if i not in self.done]
+
+    def describe(self) -> str:
+        return (f"Job {self.job_id} from {self.created_at}: {len(self.done)} of {len(self.comment_ids)} removed, "
+                f"{len(self.remaining)} left ({len(self.failed)} failed)")
+
+
+class ModerationJournal:
+    # One JSON record per line, appended and synced before the next step runs:
+    # "begin" before any id is sent, "done"/"failed" as results come back, "end" once nothing is left.
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, ModerationJob] = {}
+
+        if self._replay():
+            self._compact()
+
+
+    def pending(self) -> List[ModerationJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+
+    def begin(self, comment_ids: List[str], ban_author: bool = False) -> ModerationJob:
+        job = ModerationJob(uuid.uuid4().hex[:12], list(comment_ids), ban_author, datetime.now().isoformat(timespec="seconds"))
+        with self._lock:
+            self._append([{"event": "begin", "job": job.job_id, "ids": job.comment_ids,
+                           "ban_author": ban_author, "created_at": job.created_at}])
+            self._jobs[job.job_id] = job
+        return job
+
+
+    def record(self, job: ModerationJob, results: Iterable[ModerationResult]) -> None:
+        results = list(results)
+        done = [r.comment_id for r in results if r.ok]
+        failed = {r.comment_id: r.error or "" for r in results if not r.ok}
+        records = []
+        if done:
+            records.append({"event": "done", "job": job.job_id, "ids": done})
+        if failed:
+            records.append({"event": "failed", "job": job.job_id, "errors": failed})
+        if not records:
+            return
+        with self._lock:
+            self._append(records)
+            self._apply(job, records)
+
+
+    def mark_done(self, job: ModerationJob, comment_ids: Iterable[str]) -> None:
+        self.record(job, [ModerationResult(i, True, attempts=0) for i in comment_ids])
+
+
+    def end(self, job: ModerationJob) -> None:
+        # Also how a job is discarded: its remaining ids are never sent.
+        with self._lock:
+            self._append([{"event": "end", "job": job.job_id}])
+            self._jobs.pop(job.job_id, None)
+
+
+    def _append(self, records: List[Dict]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+
+
+    def _apply(self, job: ModerationJob, records: List[Dict]) -> None:
+        for record in records:
+            if record["event"] == "done":
+                job.done.update(record["ids"])
+                for comment_id in record["ids"]:
+                    job.failed.pop(comment_id, None)
+            elif record["event"] == "failed":
+                job.failed.update(record["errors"])
+
+
+    def _replay(self) -> bool:
+        # Rebuilds the unfinished jobs. True if the file holds ended jobs or a line torn by a crash,
+        # which must be rewritten before appending so the next record starts on its own line.
+        if not self.path.exists():
+            return False
+
+        rewrite = False
+        with open(self.path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger(f"Skipped unreadable moderation journal line {number}.", 'WARNING')
+                    rewrite = True
+                    continue
+
+                if record["event"] == "begin":
+                    self._jobs[record["job"]] = ModerationJob(record["job"], record["ids"], record["ban_author"], record["created_at"])
+                elif record["event"] == "end":
+                    self._jobs.pop(record["job"], None)
+                    rewrite = True
+                elif record["job"] in self._jobs:
+                    self._apply(self._jobs[record["job"]], [record])
+        return rewrite
+
+
+    def _compact(self) -> None:
+        # Keeps only the unfinished jobs, so the file does not grow with every run.
+        records = []
+        for job in self._jobs.values():
+            records.append({"event": "begin", "job": job.job_id, "ids": job.comment_ids,
+                            "ban_author": job.ban_author, "created_at": job.created_at})
+            if job.done:
+                records.append({"event": "done", "job": job.job_id, "ids": sorted(job.done)})
+            if job.failed:
+                records.append({"event": "failed", "job": job.job_id, "errors": job.failed})
+
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
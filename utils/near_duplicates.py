@@ -0,0 +1,185 @@
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+
+NON_WORD = re.compile(r"[\W_]+")       # Emoji, punctuation and spacing do not make a message different.
+
+_CHUNK_TEXTS = 1_000        # Bounds the (shingles x num_perm) matrix to a few MB.
+
+
+@dataclass
+class DuplicateStats:
+    texts: int = 0
+    clusters: int = 0
+    predicted: int = 0
+    propagated: int = 0
+
+    def describe(self) -> str:
+        return (f"Near-duplicates: {self.texts} comment(s) in {self.clusters} cluster(s), "
+                f"{self.predicted} scored, {self.propagated} took their cluster's verdict")
+
+
+class NearDuplicateIndex:
+    def __init__(self,
+                 threshold: float = 0.5,
+                 propagate_threshold: float = 0.9,
+                 num_perm: int = 64,
+                 bands: int = 16,
+                 shingle_size: int = 4,
+                 seed: int = 1) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands.")
+        self.threshold = threshold
+        self.propagate_threshold = propagate_threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.stats = DuplicateStats()
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)     # Odd multipliers.
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self._powers = np.array([pow(1_000_003, j, 2 ** 64) for j in range(shingle_size)], dtype=np.uint64)
+
+        # Only representatives are indexed, and each bucket keeps the first one that landed in it,
+        # so a lookup checks at most `bands` candidates however large a spam wave grows.
+        self._buckets: List[Dict[bytes, int]] = [{} for _ in range(bands)]
+        self._representatives: Dict[int, np.ndarray] = {}
+        self._seen: Dict[bytes, Tuple[int, int, float]] = {}       # Signature -> (first position, cluster, similarity).
+        self._keys: Dict[int, str] = {}
+        self.verdicts: Dict[int, int] = {}
+
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for start in range(0, len(texts), _CHUNK_TEXTS):
+            chunk = texts[start:start + _CHUNK_TEXTS]
+            signatures[start:start + len(chunk)] = self._signatures(chunk)
+        return signatures
+
+
+    def add(self, texts: Sequence[str]) -> Tuple[List[int], List[float]]:
+        # Returns, per text, the position of its cluster's representative among everything added so far
+        # and the estimated Jaccard similarity to it. A text that starts a cluster is its own representative.
+        assigned = self._assign(self.signatures(texts))
+        return [cluster for _, cluster, _ in assigned], [similarity for _, _, similarity in assigned]
+
+
+    def predict(self,
+                predict: Callable[[List[str]], Sequence[float]],
+                texts: Sequence[str],
+                keys: Optional[Sequence[str]] = None) -> Tuple[List[float], List[Union[int, str]]]:
+        # Scores representatives and loosely matched members. Exact repeats and tight members
+        # reuse the verdict of the text they match. With keys, clusters are named by their representative's key.
+        first = self.stats.texts
+        assigned = self._assign(self.signatures(texts))
+
+        sources = []
+        for i, (twin, cluster, similarity) in enumerate(assigned):
+            source = twin if twin != first + i else (cluster if similarity >= self.propagate_threshold else None)
+            if source == first + i or (source is not None and source < first and source not in self.verdicts):
+                source = None
+            sources.append(source)
+
+        pending = [i for i, source in enumerate(sources) if source is None]
+        labels = [0] * len(texts)
+        if pending:
+            for i, label in zip(pending, predict([texts[i] for i in pending])):
+                labels[i] = label
+
+        for i, (source, (twin, _, _)) in enumerate(zip(sources, assigned)):
+            if source is not None:
+                labels[i] = self.verdicts[source]       # Always an earlier position.
+            if twin == first + i:
+                self.verdicts[first + i] = labels[i]
+
+        self.stats.predicted += len(pending)
+        self.stats.propagated += len(texts) - len(pending)
+
+        clusters = [cluster for _, cluster, _ in assigned]
+        if keys is None:
+            return labels, clusters
+        for i, cluster in enumerate(clusters):
+            if cluster == first + i:
+                self._keys[cluster] = keys[i]
+        return labels, [self._keys.get(cluster, cluster) for cluster in clusters]
+
+
+    def _assign(self, signatures: np.ndarray) -> List[Tuple[int, int, float]]:
+        # (first position with the same signature, cluster, similarity) per signature.
+        rows = self.num_perm // self.bands
+        assigned = []
+
+        for offset, signature in enumerate(signatures):
+            position = self.stats.texts + offset
+            raw = signature.tobytes()
+            seen = self._seen.get(raw)
+            if seen is not None:
+                assigned.append(seen)
+                continue
+
+            keys = [raw[band * rows * 4:(band + 1) * rows * 4] for band in range(self.bands)]
+
+            best, best_similarity = position, 1.0
+            checked = set()
+            for band, key in enumerate(keys):
+                candidate = self._buckets[band].get(key)
+                if candidate is None or candidate in checked:
+                    continue
+                checked.add(candidate)
+                similarity = int(np.count_nonzero(self._representatives[candidate] == signature)) / self.num_perm
+                if similarity >= self.threshold and (best == position or similarity > best_similarity):
+                    best, best_similarity = candidate, similarity
+
+            if best == position:
+                self._representatives[position] = signature
+                for band, key in enumerate(keys):
+                    self._buckets[band].setdefault(key, position)
+                self.stats.clusters += 1
+
+            self._seen[raw] = (position, best, best_similarity)
+            assigned.append((position, best, best_similarity))
+
+        self.stats.texts += len(signatures)
+        return assigned
+
+
+    def _signatures(self, texts: Sequence[str]) -> np.ndarray:
+        # Character shingles of the text with everything but letters and digits removed, hashed with a
+        # polynomial rolling hash and min-hashed with multiply-shift hash functions.
+        size = self.shingle_size
+        cleaned = [NON_WORD.sub("", text).ljust(size, "\0") for text in texts]
+
+        # Spam waves repeat the same text, so each distinct one is hashed once.
+        unique: Dict[str, int] = {}
+        inverse = np.fromiter((unique.setdefault(text, len(unique)) for text in cleaned), dtype=np.int64, count=len(cleaned))
+        cleaned = list(unique)
+
+        lengths = np.fromiter((len(text) for text in cleaned), dtype=np.int64, count=len(cleaned))
+        codes = np.frombuffer("".join(cleaned).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+
+        count = len(codes) - size + 1
+        hashes = np.zeros(count, dtype=np.uint64)
+        for j in range(size):
+            hashes += codes[j:j + count] * self._powers[j]
+
+        # Keep shingles that lie inside one text.
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        owners = np.repeat(np.arange(len(cleaned)), lengths)[:count]
+        valid = np.arange(count) - starts[owners] <= lengths[owners] - size
+        hashes = hashes[valid]
+
+        values = (self._a[:, None] * hashes + self._b[:, None]) >> np.uint64(32)
+        group_starts = np.concatenate(([0], np.cumsum(lengths - size + 1)[:-1]))
+        signatures = np.minimum.reduceat(values, group_starts, axis=1).T.astype(np.uint32)
+        return signatures[inverse]
+
+
+def group_clusters(comments: Sequence[Dict[str, str]]) -> List[List[Dict[str, str]]]:
+    # Groups by the "cluster" key the classifier sets, in order of first appearance.
+    groups: Dict[str, List[Dict[str, str]]] = {}
+    for comment in comments:
+        groups.setdefault(comment.get("cluster", comment["id"]), []).append(comment)
+    return list(groups.values())
@@ -0,0 +1,138 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+def model_fingerprint(model_path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    inference_time: float = 0.0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def saved_time(self) -> float:
+        # Estimated from the average cost of the predictions that did run.
+        return self.hits * self.inference_time / self.misses if self.misses else 0.0
+
+    def describe(self) -> str:
+        return (f"Cache: {self.memory_hits} memory hit(s), {self.disk_hits} disk hit(s), "
+                f"{self.misses} miss(es), ~{self.saved_time:.2f}s saved")
+
+
+class PredictionCache:
+    _QUERY_CHUNK = 500
+
+    def __init__(self, fingerprint: str, path: Optional[Path] = None, capacity: int = 100_000) -> None:
+        self.fingerprint = fingerprint
+        self.capacity = capacity
+        self.stats = CacheStats()
+
+        self._memory: "OrderedDict[bytes, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute("DROP TABLE IF EXISTS predictions")        # Hard labels, before scores were kept.
+            self._db.execute("CREATE TABLE IF NOT EXISTS scores (key BLOB PRIMARY KEY, model TEXT, score REAL) WITHOUT ROWID")
+            self._db.execute("DELETE FROM scores WHERE model != ?", (fingerprint,))      # Model replaced.
+            self._db.commit()
+
+
+    def key(self, text: str) -> bytes:
+        return hashlib.blake2b(f"{self.fingerprint}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+
+    def scores(self, score_texts: Callable[[List[str]], Sequence[float]], texts: Sequence[str]) -> List[float]:
+        # Spam scores of texts, calling score_texts only for the ones not cached.
+        keys = [self.key(text) for text in texts]
+        unique_keys = list(dict.fromkeys(keys))
+
+        with self._lock:
+            memory_scores = {}
+            for key in unique_keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    memory_scores[key] = self._memory[key]
+            disk_scores = self._load([key for key in unique_keys if key not in memory_scores])
+
+        known = {**memory_scores, **disk_scores}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in known and key not in missing:
+                missing[key] = text
+
+        inference_time = 0.0
+        if missing:
+            started_at = time.perf_counter()
+            scores = score_texts(list(missing.values()))
+            inference_time = time.perf_counter() - started_at
+            known.update((key, float(s)) for key, s in zip(missing, scores))
+
+        with self._lock:
+            for key, score in disk_scores.items():
+                self._remember(key, score)
+            for key in missing:
+                self._remember(key, known[key])
+            self._store([(key, known[key]) for key in missing])
+
+            disk_hits = sum(1 for key in keys if key in disk_scores)
+            self.stats.disk_hits += disk_hits
+            self.stats.misses += len(missing)
+            self.stats.memory_hits += len(keys) - disk_hits - len(missing)
+            self.stats.inference_time += inference_time
+
+        return [known[key] for key in keys]
+
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+    def _remember(self, key: bytes, score: float) -> None:
+        self._memory[key] = score
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+
+    def _load(self, keys: List[bytes]) -> Dict[bytes, float]:
+        if self._db is None or not keys:
+            return {}
+        found = {}
+        for i in range(0, len(keys), self._QUERY_CHUNK):
+            chunk = keys[i:i + self._QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._db.execute(f"SELECT key, score FROM scores WHERE key IN ({placeholders})", chunk)
+            found.update(rows)
+        return found
+
+
+    def _store(self, items: List[tuple]) -> None:
+        if self._db is None or not items:
+            return
+        self._db.executemany(
+            "INSERT OR REPLACE INTO scores (key, model, score) VALUES (?, ?, ?)",
+            [(key, self.fingerprint, score) for key, score in items]
+        )
+        self._db.commit()
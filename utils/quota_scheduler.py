@@ -0,0 +1,234 @@
+import atexit
+import json
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Optional
+from config.config import Config
+from utils.metrics import observe
+
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")        # The daily quota resets at midnight Pacific time.
+except Exception:
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+
+QUOTA_COSTS = {
+    "commentThreads.list": 1,
+    "comments.list": 1,
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "comments.setModerationStatus": 50,
+}
+
+PRIORITY_MODERATION = 0
+PRIORITY_LOADING = 1
+
+
+def operation_cost(operation: str) -> int:
+    return QUOTA_COSTS.get(operation, 1)
+
+
+class QuotaExceeded(Exception):
+    def __init__(self, operation: str, cost: int, remaining: int) -> None:
+        super().__init__(f"Quota budget reached: {operation} needs {cost} unit(s), {remaining} left for it today.")
+        self.operation = operation
+        self.cost = cost
+        self.remaining = remaining
+
+
+@dataclass
+class QuotaUsage:
+    day: str = ""
+    used: int = 0
+    calls: Dict[str, int] = field(default_factory=dict)
+    units: Dict[str, int] = field(default_factory=dict)
+    waited: float = 0.0
+
+    def describe(self) -> str:
+        spent = ", ".join(f"{op} {units}" for op, units in sorted(self.units.items(), key=lambda item: -item[1]))
+        return f"Quota: {self.used} unit(s) used today ({spent or 'none'}), {self.waited:.2f}s rate-limited"
+
+
+@dataclass
+class QuotaEstimate:
+    cost: int
+    remaining: int
+
+    @property
+    def fits(self) -> bool:
+        return self.cost <= self.remaining
+
+    def describe(self) -> str:
+        return f"Needs ~{self.cost} quota unit(s), {self.remaining} left today."
+
+
+class QuotaScheduler:
+    def __init__(self,
+                 daily_quota: int = 10_000,
+                 reserve: int = 0,
+                 rate: float = 20.0,
+                 burst: int = 20,
+                 path: Optional[Path] = None,
+                 save_interval: float = 1.0) -> None:
+        self.daily_quota = daily_quota
+        self.reserve = reserve
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.path = Path(path) if path is not None else None
+        self.save_interval = save_interval
+        self.usage = QuotaUsage(day=self._today())
+
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._waiting = Counter()
+        self._condition = threading.Condition()
+        self._save_lock = threading.Lock()
+        self._saved_at = 0.0
+        self._changes = 0           # Bumped per charged call; the file holds `_saved_changes` of them.
+        self._saved_changes = 0
+        self._load()
+
+
+    def remaining(self, priority: int = PRIORITY_MODERATION) -> int:
+        # Loading may not dip into the units kept back for moderation.
+        with self._condition:
+            self._roll_day()
+            return self._remaining(priority)
+
+
+    def acquire(self, operation: str, priority: int = PRIORITY_LOADING, calls: int = 1) -> None:
+        cost = operation_cost(operation) * calls
+        snapshot = None
+        with self._condition:
+            self._waiting[priority] += 1
+            started_at = time.monotonic()
+            try:
+                while True:
+                    self._roll_day()
+                    remaining = self._remaining(priority)
+                    if cost > remaining:
+                        raise QuotaExceeded(operation, cost, remaining)
+
+                    # Higher priorities go first; the bucket holds at most `burst` requests.
+                    self._refill()
+                    ahead = any(self._waiting[p] for p in range(priority))
+                    if not ahead and self._tokens >= min(calls, self.burst):
+                        self._tokens -= min(calls, self.burst)
+                        break
+                    self._condition.wait(timeout=max(0.001, (min(calls, self.burst) - self._tokens) / self.rate))
+
+                self.usage.used += cost
+                self.usage.calls[operation] = self.usage.calls.get(operation, 0) + calls
+                self.usage.units[operation] = self.usage.units.get(operation, 0) + cost
+                waited = time.monotonic() - started_at
+                self.usage.waited += waited
+                observe("quota_wait_seconds", waited)
+                self._changes += 1
+                snapshot = self._snapshot(force=False)
+
+            finally:
+                self._waiting[priority] -= 1
+                self._condition.notify_all()
+
+        if snapshot is not None:
+            self._save(snapshot)        # Outside the lock, so other requests are not held up by the write.
+
+
+    def flush(self) -> None:
+        # Writes usage charged since the last save.
+        with self._condition:
+            snapshot = self._snapshot(force=True)
+        if snapshot is not None:
+            self._save(snapshot)
+
+
+    def estimate(self, plan: Dict[str, int], priority: int = PRIORITY_MODERATION) -> QuotaEstimate:
+        cost = sum(operation_cost(operation) * calls for operation, calls in plan.items())
+        return QuotaEstimate(cost, self.remaining(priority))
+
+
+    def estimate_moderation(self, count: int, ids_per_call: int) -> QuotaEstimate:
+        calls = -(-count // max(1, ids_per_call))
+        return self.estimate({"comments.setModerationStatus": calls})
+
+
+    def _remaining(self, priority: int) -> int:
+        budget = self.daily_quota - (self.reserve if priority > PRIORITY_MODERATION else 0)
+        return max(0, budget - self.usage.used)
+
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+
+    def _today(self) -> str:
+        return datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+
+    def _roll_day(self) -> None:
+        today = self._today()
+        if self.usage.day != today:
+            self.usage = QuotaUsage(day=today)
+
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            saved = json.loads(self.path.read_text(encoding="utf-8"))
+            if saved.get("day") == self.usage.day:
+                self.usage.used = int(saved.get("used", 0))
+                self.usage.units = dict(saved.get("units", {}))
+        except (ValueError, OSError):
+            pass        # A broken file only loses today's count.
+
+
+    def _snapshot(self, force: bool) -> Optional[Dict]:
+        # Usage to save, at most once per save_interval. Taken under the lock; written outside it.
+        if self.path is None or self._changes == self._saved_changes:
+            return None
+        now = time.monotonic()
+        if not force and now - self._saved_at < self.save_interval:
+            return None
+        self._saved_at = now
+        return {"changes": self._changes, "day": self.usage.day, "used": self.usage.used, "units": dict(self.usage.units)}
+
+
+    def _save(self, snapshot: Dict) -> None:
+        with self._save_lock:
+            if snapshot["changes"] <= self._saved_changes:
+                return      # A newer snapshot was written first.
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = self.path.with_name(self.path.name + ".tmp")
+                temp_path.write_text(json.dumps({k: snapshot[k] for k in ("day", "used", "units")}), encoding="utf-8")
+                temp_path.replace(self.path)
+                self._saved_changes = snapshot["changes"]
+            except OSError:
+                pass
+
+
+_scheduler: Optional[QuotaScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_quota_scheduler() -> QuotaScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = QuotaScheduler(
+                Config.DAILY_QUOTA,
+                Config.QUOTA_RESERVE,
+                Config.API_RATE,
+                Config.API_BURST,
+                Config.QUOTA_PATH
+            )
+            atexit.register(_scheduler.flush)
+        return _scheduler
@@ -0,0 +1,40 @@
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+import numpy as np
+from config.config import Config
+from utils.keyword_matcher import KeywordMatcher
+
+
+TIER_AUTO = "auto"
+TIER_REVIEW = "review"
+TIER_KEEP = "keep"
+
+
+def spam_scores(model: Any, texts: Sequence[str]) -> np.ndarray:
+    # Probability of the spam class. LinearSVC has no predict_proba, so its margin goes
+    # through a sigmoid, as the compact model does; 0.5 is then the predict() boundary.
+    if len(texts) == 0:
+        return np.array([], dtype=np.float64)
+    positive = list(model.classes_).index(1)
+    if hasattr(model, "predict_proba"):
+        return model.predict_proba(texts)[:, positive]
+    scores = model.decision_function(texts)
+    if scores.ndim > 1:
+        scores = scores[:, positive]
+    elif positive == 0:
+        scores = -scores
+    return 1.0 / (1.0 + np.exp(-scores))
+
+
+@dataclass
+class TierPolicy:
+    matcher: Optional[KeywordMatcher] = None
+    auto_threshold: float = Config.AUTO_REMOVE_THRESHOLD
+    review_threshold: float = Config.REVIEW_THRESHOLD
+
+    def tier(self, score: float) -> str:
+        if score >= self.auto_threshold:
+            return TIER_AUTO
+        if score > self.review_threshold:
+            return TIER_REVIEW
+        return TIER_KEEP
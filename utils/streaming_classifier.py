@@ -0,0 +1,226 @@
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from queue import Empty, Queue
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+from utils.assets_loader import load_tier_policy
+from utils.comment_normalizer import normalize_comments
+from utils.comment_table import CommentRow, CommentTable, column
+from utils.metrics import count, timed
+from utils.near_duplicates import NearDuplicateIndex
+from utils.prediction_cache import PredictionCache
+from utils.spam_tiers import TIER_AUTO, TIER_KEEP, TIER_REVIEW, TierPolicy, spam_scores
+
+
+@dataclass
+class ClassifierStats:
+    pages: int = 0
+    classified: int = 0
+    flagged: int = 0
+    keyword_hits: int = 0
+    scored: int = 0
+    auto: int = 0
+    review: int = 0
+    keyword_time: float = 0.0
+    scoring_time: float = 0.0
+    inference_time: float = 0.0
+    started_at: float = field(default_factory=time.perf_counter)
+    first_flagged_after: Optional[float] = None
+
+    def describe(self) -> str:
+        text = f"Flagged: {self.flagged}/{self.classified} ({self.review} to review)"
+        if self.first_flagged_after is not None:
+            text += f" (first after {self.first_flagged_after:.1f}s)"
+        return text
+
+    def describe_stages(self) -> str:
+        return (f"Keywords: {self.keyword_hits} hit(s) in {self.keyword_time:.2f}s | "
+                f"Model: {self.scored} scored in {self.scoring_time:.2f}s | "
+                f"Tiers: {self.auto} auto, {self.review} review, {self.classified - self.flagged} keep")
+
+
+class StreamingClassifier:
+    _DONE = object()
+
+    def __init__(self,
+                 model_handle: "Future[Any]",
+                 cache: Optional[PredictionCache] = None,
+                 policy: Optional[TierPolicy] = None) -> None:
+        self.model_handle = model_handle
+        self.cache = cache
+        self.policy = policy or load_tier_policy()        # The configured keywords and thresholds.
+        self.stats = ClassifierStats()
+        self.flagged = CommentTable()       # Only flagged comments outlive their page.
+        self.error: Optional[Exception] = None
+        self.index: Optional[NearDuplicateIndex] = None
+        self.started = False
+
+        self._pages: Queue = Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._score_texts: Optional[Callable[[List[str]], Sequence[float]]] = None
+
+
+    @property
+    def model(self) -> Any:
+        return self.model_handle.result()       # Blocks until the model is loaded.
+
+
+    @property
+    def model_ready(self) -> bool:
+        return self.model_handle.done() and self.model_handle.result() is not None
+
+
+    def start(self,
+              index: Optional[NearDuplicateIndex] = None,
+              score_texts: Optional[Callable[[List[str]], Sequence[float]]] = None) -> None:
+        # A fresh index per run clusters spam waves across pages so each is scored once.
+        # score_texts scores each batch of queued pages, e.g. a BatchPredictor for a large backlog.
+        self.finish()
+        self.stats = ClassifierStats()
+        self.flagged = CommentTable()
+        self.error = None
+        self.index = index
+        self.started = True
+        self._score_texts = score_texts
+
+        self._pages = Queue()
+        self._worker = threading.Thread(target=self._classify_service, args=(self._pages, self.flagged, self.stats), daemon=True)
+        self._worker.start()
+
+
+    def submit(self, comments: List[Dict[str, str]]) -> None:
+        if self._worker is not None:
+            self._pages.put(comments)
+
+
+    def finish(self) -> None:
+        if self._worker is not None:
+            self._pages.put(self._DONE)
+            self._worker = None
+
+
+    def wait(self) -> List[CommentRow]:
+        self._pages.join()      # Every submitted page is classified.
+        if self.error is not None:
+            raise self.error
+        with self._lock:
+            return self.flagged[:]
+
+
+    def scores(self, texts: List[str], score_texts: Optional[Callable[[List[str]], Sequence[float]]] = None) -> List[float]:
+        # score_texts stands in for the loaded model, e.g. a BatchPredictor for large sets.
+        if score_texts is None:
+            score_texts = lambda pending: spam_scores(self.model, pending)
+        if self.cache is not None:
+            return self.cache.scores(score_texts, texts)
+        return list(score_texts(texts))
+
+
+    def classify(self,
+                 comments: Union[CommentTable, List[Dict[str, str]]],
+                 texts: List[str],
+                 stats: ClassifierStats,
+                 score_texts: Optional[Callable[[List[str]], Sequence[float]]] = None) -> List[Dict[str, str]]:
+        # Stages: near-duplicates take their cluster's score, keyword matches are flagged outright,
+        # and the model scores the rest. Scores then sort comments into tiers.
+        started_at = time.perf_counter()
+        stage = ClassifierStats()
+        matched: Dict[str, str] = {}
+
+        def score_pending(pending: List[str]) -> List[float]:
+            keyword_started_at = time.perf_counter()
+            with timed("keyword_seconds"):
+                matcher = self.policy.matcher
+                keywords = matcher.search_many(pending) if matcher is not None else [None] * len(pending)
+            rest = [text for text, keyword in zip(pending, keywords) if keyword is None]
+            stage.keyword_time += time.perf_counter() - keyword_started_at
+
+            scoring_started_at = time.perf_counter()
+            with timed("predict_seconds"):
+                rest_scores = iter(self.scores(rest, score_texts) if rest else [])
+            stage.scoring_time += time.perf_counter() - scoring_started_at
+            stage.keyword_hits += len(pending) - len(rest)
+            stage.scored += len(rest)
+
+            scores = []
+            for text, keyword in zip(pending, keywords):
+                if keyword is None:
+                    scores.append(next(rest_scores))
+                else:
+                    matched[text] = keyword
+                    scores.append(1.0)
+            return scores
+
+        if self.index is not None:
+            scores, clusters = self.index.predict(score_pending, texts, column(comments, "id"))
+        else:
+            scores, clusters = score_pending(texts), [None] * len(texts)
+
+        page_flagged = []
+        for i, (text, score, cluster) in enumerate(zip(texts, scores, clusters)):
+            tier = self.policy.tier(score)
+            if tier == TIER_KEEP:
+                continue
+            comment = comments[i]       # Only flagged rows are looked up.
+            comment["tier"] = tier
+            comment["score"] = round(float(score), 4)
+            if text in matched:
+                comment["keyword"] = matched[text]
+            if cluster is not None:
+                comment["cluster"] = cluster        # Lets the confirmation group a wave into one row.
+            page_flagged.append(comment)
+            stage.auto += tier == TIER_AUTO
+            stage.review += tier == TIER_REVIEW
+
+        count("comments_classified", len(comments))
+        count("comments_flagged", len(page_flagged))
+        count("keyword_hits", stage.keyword_hits)
+        with self._lock:
+            stats.pages += 1
+            stats.classified += len(comments)
+            stats.flagged += len(page_flagged)
+            stats.keyword_hits += stage.keyword_hits
+            stats.scored += stage.scored
+            stats.auto += stage.auto
+            stats.review += stage.review
+            stats.keyword_time += stage.keyword_time
+            stats.scoring_time += stage.scoring_time
+            stats.inference_time += time.perf_counter() - started_at
+            if page_flagged and stats.first_flagged_after is None:
+                stats.first_flagged_after = time.perf_counter() - stats.started_at
+        return page_flagged
+
+
+    def _classify_service(self, pages: Queue, flagged: CommentTable, stats: ClassifierStats) -> None:
+        done = False
+        while not done:
+            # Pages queued while the model loaded or the last batch was scored are classified together,
+            # so a backlog (or the stored comments of a video) reaches score_texts as one large set.
+            batch = [pages.get()]
+            while batch[-1] is not self._DONE:
+                try:
+                    batch.append(pages.get_nowait())
+                except Empty:
+                    break
+            done = batch[-1] is self._DONE
+            comments = [c for page in batch if page is not self._DONE for c in page]
+            try:
+                if comments and self.model is not None and self.error is None:
+                    self._classify(comments, flagged, stats)
+
+            except Exception as e:
+                self.error = e
+
+            finally:
+                for _ in batch:
+                    pages.task_done()
+
+
+    def _classify(self, comments: List[Dict[str, str]], flagged: CommentTable, stats: ClassifierStats) -> None:
+        with timed("normalize_seconds"):
+            texts = normalize_comments([c["text"] for c in comments])
+        page_flagged = self.classify(comments, texts, stats, self._score_texts)
+        with self._lock:
+            flagged.extend(page_flagged)
@@ -0,0 +1,49 @@
+import json
+import os
+from pathlib import Path
+from typing import List, Optional
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+
+
+def save_credentials(credentials: Credentials, path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + ".tmp")
+
+    # Owner read/write only; the refresh token grants access to the channel.
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(credentials.to_json())
+    os.replace(temp_path, path)
+
+
+def load_credentials(path: Path, scopes: List[str], client_id: Optional[str] = None) -> Optional[Credentials]:
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    with open(path, "r", encoding="utf-8") as f:
+        info = json.load(f)
+    if client_id is not None and info.get("client_id") != client_id:
+        return None         # Saved for another OAuth client.
+    return Credentials.from_authorized_user_info(info, scopes)
+
+
+def refresh_credentials(credentials: Credentials) -> bool:
+    if credentials.valid:
+        return True
+    if not credentials.refresh_token:
+        return False
+
+    try:
+        credentials.refresh(Request())
+        return True
+
+    except RefreshError:
+        return False
+
+
+def delete_credentials(path: Path) -> None:
+    Path(path).unlink(missing_ok=True)
@@ -0,0 +1,214 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from collections import Counter
+from typing import Callable, Iterator, List, Optional
+import httplib2
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import DISCOVERY_URI, Resource, build_from_document
+from config.config import Config
+from utils.quota_scheduler import PRIORITY_LOADING, PRIORITY_MODERATION, QuotaScheduler
+
+
+def load_discovery_document() -> str:
+    document = discovery_cache.get_static_doc("youtube", "v3")       # Bundled with googleapiclient.
+    if document is not None:
+        return document
+
+    if Config.DISCOVERY_CACHE_PATH.exists():
+        return Config.DISCOVERY_CACHE_PATH.read_text(encoding="utf-8")
+
+    response, content = httplib2.Http().request(DISCOVERY_URI.format(api="youtube", apiVersion="v3"))
+    if response.status != 200:
+        raise RuntimeError(f"Discovery document request failed with status {response.status}.")
+    document = content.decode("utf-8")
+
+    json.loads(document)        # Never cache a broken document.
+    Config.DISCOVERY_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    Config.DISCOVERY_CACHE_PATH.write_text(document, encoding="utf-8")
+    return document
+
+
+class SharedCredentials:
+    def __init__(self, credentials: Credentials) -> None:
+        self.credentials = credentials
+        self._lock = threading.Lock()
+
+
+    def __getattr__(self, name: str):
+        return getattr(self.credentials, name)
+
+
+    def before_request(self, request, method, url, headers) -> None:
+        with self._lock:
+            if not self.credentials.valid:
+                self.credentials.refresh(request)
+        self.credentials.apply(headers)
+
+
+    def refresh(self, request) -> None:
+        with self._lock:        # One refresh at a time across every pooled transport.
+            self.credentials.refresh(request)
+
+
+class _ScheduledRequest:
+    def __init__(self, request, operation: str, scheduler: QuotaScheduler, priority: int) -> None:
+        self.request = request
+        self.operation = operation
+        self.scheduler = scheduler
+        self.priority = priority
+
+
+    def __getattr__(self, name: str):
+        return getattr(self.request, name)
+
+
+    def execute(self, *args, **kwargs):
+        self.scheduler.acquire(self.operation, self.priority)
+        return self.request.execute(*args, **kwargs)
+
+
+class _ScheduledBatch:
+    def __init__(self, batch, scheduler: QuotaScheduler, priority: int) -> None:
+        self.batch = batch
+        self.scheduler = scheduler
+        self.priority = priority
+        self.operations = Counter()
+
+
+    def add(self, request, callback=None, request_id=None) -> None:
+        if isinstance(request, _ScheduledRequest):
+            self.operations[request.operation] += 1
+            request = request.request
+        self.batch.add(request, callback=callback, request_id=request_id)
+
+
+    def execute(self, *args, **kwargs):
+        for operation, calls in self.operations.items():
+            self.scheduler.acquire(operation, self.priority, calls=calls)
+        return self.batch.execute(*args, **kwargs)
+
+
+class _ScheduledCollection:
+    def __init__(self, collection, name: str, scheduler: QuotaScheduler, priority: int) -> None:
+        self.collection = collection
+        self.name = name
+        self.scheduler = scheduler
+        self.priority = priority
+
+
+    def __getattr__(self, method: str):
+        build = getattr(self.collection, method)
+        operation = f"{self.name}.{method}"
+        return lambda *args, **kwargs: _ScheduledRequest(build(*args, **kwargs), operation, self.scheduler, self.priority)
+
+
+class ScheduledClient:
+    # Every request built through this client is charged to the quota scheduler when executed.
+    def __init__(self, client: Resource, scheduler: QuotaScheduler, priority: int = PRIORITY_LOADING) -> None:
+        self.client = client
+        self.scheduler = scheduler
+        self.priority = priority
+
+
+    def __getattr__(self, name: str):
+        collection = getattr(self.client, name)
+        return lambda *args, **kwargs: _ScheduledCollection(collection(*args, **kwargs), name, self.scheduler, self.priority)
+
+
+    def new_batch_http_request(self, callback=None) -> _ScheduledBatch:
+        return _ScheduledBatch(self.client.new_batch_http_request(callback=callback), self.scheduler, self.priority)
+
+
+@dataclass
+class PoolMetrics:
+    leases: int = 0
+    created: int = 0
+    reused: int = 0
+    waited: int = 0
+    wait_time: float = 0.0
+    max_wait_time: float = 0.0
+
+    def describe(self) -> str:
+        return (f"Client pool: {self.leases} lease(s), {self.created} created, {self.reused} reused, "
+                f"{self.waited} waited ({self.wait_time:.2f}s total, {self.max_wait_time * 1000:.0f} ms max)")
+
+
+class YouTubeClientPool:
+    def __init__(self, factory: Callable[[], Resource], size: int = 4, scheduler: Optional[QuotaScheduler] = None) -> None:
+        self.factory = factory
+        self.size = max(1, size)
+        self.scheduler = scheduler
+        self.metrics = PoolMetrics()
+
+        self._idle: List[Resource] = []
+        self._waiting = Counter()
+        self._condition = threading.Condition()
+
+
+    @classmethod
+    def for_credentials(cls,
+                        credentials: Credentials,
+                        size: int = 4,
+                        timeout: Optional[float] = None,
+                        scheduler: Optional[QuotaScheduler] = None) -> "YouTubeClientPool":
+        shared = SharedCredentials(credentials)
+        document = load_discovery_document()
+        # Each client owns one keep-alive httplib2 connection; they are not thread-safe.
+        factory = lambda: build_from_document(document, http=AuthorizedHttp(shared, http=httplib2.Http(timeout=timeout)))
+        return cls(factory, size, scheduler)
+
+
+    @contextmanager
+    def lease(self, priority: int = PRIORITY_LOADING) -> Iterator[Resource]:
+        client = self._acquire(priority)
+        try:
+            yield client if self.scheduler is None else ScheduledClient(client, self.scheduler, priority)
+        finally:
+            with self._condition:
+                self._idle.append(client)
+                self._condition.notify_all()
+
+
+    def _acquire(self, priority: int) -> Resource:
+        # Like the quota scheduler, a returned client goes to the highest priority waiting, so a
+        # removal waits for the next free client rather than behind every queued page fetch.
+        started_at = time.perf_counter()
+        waited = False
+        with self._condition:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    ahead = any(self._waiting[p] for p in range(PRIORITY_MODERATION, priority))
+                    if self._idle and not ahead:
+                        client = self._idle.pop()
+                        self.metrics.leases += 1
+                        self.metrics.reused += 1
+                        if waited:
+                            elapsed = time.perf_counter() - started_at
+                            self.metrics.waited += 1
+                            self.metrics.wait_time += elapsed
+                            self.metrics.max_wait_time = max(self.metrics.max_wait_time, elapsed)
+                        return client
+                    if self.metrics.created < self.size:
+                        self.metrics.created += 1
+                        self.metrics.leases += 1
+                        break
+                    waited = True
+                    self._condition.wait()
+            finally:
+                self._waiting[priority] -= 1
+                self._condition.notify_all()
+
+        try:
+            return self.factory()
+        except Exception:
+            with self._condition:
+                self.metrics.created -= 1
+                self.metrics.leases -= 1
+                self._condition.notify_all()
+            raise